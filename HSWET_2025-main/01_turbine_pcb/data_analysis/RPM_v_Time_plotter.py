@@ -17,10 +17,15 @@ file_path = "HSWET/RPM_vs_Time_test.csv"
 
 #read CSV
 df = pd.read_csv(file_path)
+df.columns = df.columns.str.strip()
 
-#assume that time between data logging is 0.25 seconds
-time = np.arange(0, len(df) * 0.25, 0.25)
-rpm = df[' RPM'].values
+#newer logs have the fitted host time of every frame (step02_log_pwr_curve_data.py),
+#older ones assume that time between data logging is 0.25 seconds
+if 'Host Time (s)' in df.columns:
+    time = df['Host Time (s)'].values
+else:
+    time = np.arange(len(df)) * 0.25
+rpm = df['RPM'].values
 
 fig = plt.figure(figsize=(8, 6))
 plt.plot(time, rpm)
@@ -1,52 +1,68 @@
+import matplotlib
+matplotlib.use('Agg') #render straight to png files, no windows (also works in worker processes)
 import pandas as pd
 import os as os
 from matplotlib import pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import numpy as np
 from pathlib import Path
-from scipy.interpolate import griddata
+from concurrent.futures import ProcessPoolExecutor
+from scipy.interpolate import CloughTocher2DInterpolator
+from scipy.spatial import Delaunay
 
 # TODO make fonts bigger
- 
-#Change "HSWET/Figures" for different output folder path 
+
+#Change "HSWET/Figures" for different output folder path
 out_folder_path = "HSWET/Figures/"
-os.makedirs(out_folder_path, exist_ok= True)
 #Change inside Path -> "Windspeed Tests Outputs" for a different input folder path to loop through
 folder_path = Path("HSWET/Windspeed_Tests_Outputs")
-os.makedirs(folder_path, exist_ok= True) 
 #set date:
 date = "04-24-2025"
-os.makedirs(os.path.join(out_folder_path, date +"_Tests/"), exist_ok= True)
 
-out_folder_path = out_folder_path + date + "_Tests/"
+#figures are only redrawn when the csv (or this script) is newer than them, like make.
+#set to True to redraw everything
+force_replot = False
+#number of processes drawing figures (None = one per CPU)
+workers = None
+
+
+#columns of Maxes.csv (any other columns of the runs come after them)
+maxes_columns = ['Windspeed', 'Pitch', 'Voltage', 'Current', 'Resistance', 'Power', 'RPM', 'Load Setting']
+
+
+def maxes_frame(max_rows):
+    """Join the max power rows of the runs into Maxes.csv, starting from the maxes_columns frame"""
+    return pd.concat([pd.DataFrame(columns = maxes_columns)] + max_rows, ignore_index = True)
 
-#create new dataframe to hold all max data
-maxes_csv = pd.DataFrame(columns = ['Windspeed', 'Pitch', 'Voltage', 'Current', 'Resistance', 
-                                    'Power', 'RPM', 'Load Setting'])
 
-#iterate through all files in folder
-for file_path in folder_path.glob("*.csv"):
+def output_paths(out_folder, file_path):
+    """The three figures drawn for one csv"""
+    out_file_path = out_folder + file_path.stem
+    return [out_file_path + "1.png", out_file_path + "2.png", out_file_path + "3.png"]
 
-    df = pd.read_csv(file_path)
-    length = len(file_path.name)
-    out_file_path = (file_path.name)[:length - 4]
 
-    #add the row with max power to output dataframe
-    max_power_row = df['Power'].idxmax()    
-    maxes_csv = pd.concat([maxes_csv, df.loc[[max_power_row]]], ignore_index = True)
+def needs_plot(file_path, outputs):
+    """True when a figure is missing or older than the csv or this script"""
+    if force_replot or not all(os.path.exists(out) for out in outputs):
+        return True
+    newest_input = max(os.path.getmtime(file_path), os.path.getmtime(__file__))
+    return min(os.path.getmtime(out) for out in outputs) < newest_input
 
+
+def lattice_key(df):
+    """Runs that sampled the same (pitch, resistance) points can share one triangulation"""
+    return np.ascontiguousarray(df[['Pitch', 'Resistance']].to_numpy(dtype=float)).tobytes()
+
+
+def plot_file(df, outputs, tri):
+    """Draw the three figures for one run. tri is the Delaunay triangulation of its (pitch, resistance) points"""
     #define grid range
     pitch_vals = np.linspace(df['Pitch'].min(), df['Pitch'].max(), 50)
     resistance_vals = np.linspace(df['Resistance'].min(), df['Resistance'].max(), 50)
     Pitch_grid, Resistance_grid = np.meshgrid(pitch_vals, resistance_vals)
 
-    #interpolate Power values on the grid
-    Power_grid = griddata(
-        (df['Pitch'], df['Resistance']),
-        df['Power'],
-        (Pitch_grid, Resistance_grid),
-        method='cubic'
-    )
+    #interpolate Power values on the grid (same as griddata(..., method='cubic'), minus the triangulation)
+    Power_grid = CloughTocher2DInterpolator(tri, df['Power'].to_numpy(dtype=float))(Pitch_grid, Resistance_grid)
 
     #create the 3D surface plot
     fig = plt.figure(figsize=(12, 8))
@@ -61,7 +77,7 @@ for file_path in folder_path.glob("*.csv"):
     ax.xaxis._axinfo['grid']['color'] = light_gray
     ax.yaxis._axinfo['grid']['color'] = light_gray
     ax.zaxis._axinfo['grid']['color'] = light_gray
-    plt.savefig(out_folder_path + out_file_path + "1.png") #change "Figure/" to specify output path
+    plt.savefig(outputs[0]) #change "Figure/" to specify output path
     plt.close(fig)
 
 
@@ -75,7 +91,7 @@ for file_path in folder_path.glob("*.csv"):
     ax.set_title('Power vs Resistance for Different Pitch Values', fontsize = 20, family = 'Arial')
     ax.legend(fontsize = 14)
     plt.grid(True, color = "lightgray", alpha = 0.5)
-    plt.savefig(out_folder_path + out_file_path + "2.png") #specify path to store data
+    plt.savefig(outputs[1]) #specify path to store data
     plt.close(fig)
 
 
@@ -89,7 +105,57 @@ for file_path in folder_path.glob("*.csv"):
     ax.set_title('Power vs Pitch for Different Resistance Values', fontsize = 20, family = 'Arial')
     ax.legend(fontsize = 14)
     plt.grid(True, color = "lightgray", alpha = 0.5)
-    plt.savefig(out_folder_path + out_file_path +  "3.png") #specify path to store data
+    plt.savefig(outputs[2]) #specify path to store data
     plt.close(fig)
 
-maxes_csv.to_csv(out_folder_path + "Maxes.csv", index = False) #output/save maxes csv
+
+def plot_group(jobs):
+    """Draw every run in jobs, which all share one (pitch, resistance) lattice: triangulate it once"""
+    first_df = jobs[0][0]
+    tri = Delaunay(first_df[['Pitch', 'Resistance']].to_numpy(dtype=float))
+    for df, outputs in jobs:
+        plot_file(df, outputs, tri)
+    return len(jobs)
+
+
+if __name__ == '__main__':
+    os.makedirs(out_folder_path, exist_ok= True)
+    os.makedirs(folder_path, exist_ok= True)
+    os.makedirs(os.path.join(out_folder_path, date +"_Tests/"), exist_ok= True)
+
+    out_folder_path = out_folder_path + date + "_Tests/"
+
+    #max power row of every file, joined into one dataframe at the end (growing a dataframe
+    #with pd.concat in the loop copies it every time)
+    max_rows = []
+
+    #iterate through all files in folder, keeping the ones whose figures are out of date
+    groups = {}
+    skipped = 0
+    for file_path in sorted(folder_path.glob("*.csv")):
+
+        df = pd.read_csv(file_path)
+
+        #add the row with max power to output dataframe
+        max_rows.append(df.loc[[df['Power'].idxmax()]])
+
+        outputs = output_paths(out_folder_path, file_path)
+        if not needs_plot(file_path, outputs):
+            skipped += 1
+            continue
+        groups.setdefault(lattice_key(df), []).append((df, outputs))
+
+    #draw the out of date runs in parallel. Each task is a few runs from one lattice, so it
+    #triangulates once, and a day where every run shares a lattice still uses all processes
+    stale = sum(len(jobs) for jobs in groups.values())
+    per_task = max(1, -(-stale // (workers or os.cpu_count() or 1)))
+    tasks = [jobs[i:i + per_task] for jobs in groups.values() for i in range(0, len(jobs), per_task)]
+    plotted = 0
+    if tasks:
+        with ProcessPoolExecutor(workers) as pool:
+            plotted = sum(pool.map(plot_group, tasks))
+    print(f"Plotted {plotted} runs ({len(groups)} lattices), {skipped} already up to date")
+
+    maxes_csv = maxes_frame(max_rows)
+    maxes_csv.to_csv(out_folder_path + "Maxes.csv", index = False) #output/save maxes csv
+    #for the power curve over every run ever logged, see python -m hswet_logger.summary
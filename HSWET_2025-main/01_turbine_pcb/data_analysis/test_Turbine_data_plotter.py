@@ -0,0 +1,34 @@
+import pandas as pd
+
+from Turbine_data_plotter import maxes_columns, maxes_frame
+
+
+def baseline_maxes(runs):
+    # How Maxes.csv was built before: concat onto the seed frame one run at a time
+    maxes_csv = pd.DataFrame(columns = maxes_columns)
+    for df in runs:
+        maxes_csv = pd.concat([maxes_csv, df.loc[[df['Power'].idxmax()]]], ignore_index = True)
+    return maxes_csv
+
+
+def test_maxes_frame_matches_baseline(tmp_path):
+    runs = [
+        #columns in another order, plus one the seed frame does not have
+        pd.DataFrame({'RPM': [3000.0, 3100.0], 'Power': [12.5, 30.25], 'Pitch': [1300, 1400],
+                      'Windspeed': [9, 9], 'Voltage': [10.0, 11.0], 'Current': [1.25, 2.75],
+                      'Resistance': [8, 4], 'Load Setting': [2, 3], 'Time': [0.25, 0.5]}),
+        pd.DataFrame({'Windspeed': [10, 10], 'Pitch': [1100, 1200], 'Voltage': [20.7, 21.6],
+                      'Current': [4.1, 2.2], 'Resistance': [5, 10], 'Power': [85.3, 46.9],
+                      'RPM': [5241.6, 4907.1], 'Load Setting': [0, 1]}),
+    ]
+    expected = baseline_maxes(runs)
+    result = maxes_frame([df.loc[[df['Power'].idxmax()]] for df in runs])
+    assert list(result.columns) == maxes_columns + ['Time']
+    pd.testing.assert_frame_equal(result, expected)
+    result.to_csv(tmp_path / "new.csv", index = False)
+    expected.to_csv(tmp_path / "baseline.csv", index = False)
+    assert (tmp_path / "new.csv").read_text() == (tmp_path / "baseline.csv").read_text()
+
+
+def test_maxes_frame_without_runs_has_the_columns():
+    assert list(maxes_frame([]).columns) == maxes_columns
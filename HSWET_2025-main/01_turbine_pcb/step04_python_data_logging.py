@@ -1,9 +1,13 @@
 import serial
-import numpy as np 
-import struct
 import datetime
 import time
 import os
+import sys
+
+# Shared logger code lives in HSWET_2025-main/hswet_logger
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from hswet_logger import ChunkedWriter, SerialReader, get_schema
+from hswet_logger.schemas import parse_margins
 
 # [USER INPUT]
 windspeed = 7
@@ -51,7 +55,6 @@ os.makedirs(output_folder, exist_ok=True)
 
 filename = f'{output_folder}/windspeed_{windspeed_str}_rload_{r_load_str}_{timestamp}.csv'
 
-times, voltages, currents, powers, rpms, pitches, load_settings = [], [], [], [], [], [], [], []
 voltage = 0
 current = 0
 power = 0
@@ -65,11 +68,10 @@ reset_arduino(ser)
 time.sleep(1)
 # get RPM MARGINS value
 line = ser.readline().decode('ascii', errors='ignore').strip()
-if not line.startswith("RPM_MARGINS:"):
+margins = parse_margins(line)
+if margins is None:
     raise RuntimeError(f"Expected margins header, got: {line!r}")
-high_str, low_str = line.split(":",1)[1].split(",")
-rpm_high = int(high_str)
-rpm_low  = int(low_str)
+rpm_high, rpm_low = margins
 print(f"▶Got RPM_MARGIN_HIGH={rpm_high}, LOW={rpm_low}")
 
 ser.reset_input_buffer()
@@ -88,54 +90,67 @@ filename = (f"{output_folder}/"
 
 print(f"Logging into {filename} …")
 
+# SensorData layout, plausibility limits and CSV columns of the 2025 competition sketch
+# (see hswet_logger/schemas.py). Frames outside the limits are treated as misaligned.
+schema = get_schema('step04')
+decoder = schema.decoder(on_text=lambda line: print(f"ARDUINO : {line}"))
+
+# Rows are appended to the CSV (and a float32 .bin copy) every CHUNK_ROWS frames,
+# so a crash loses at most one chunk. Files are fsync'ed every FSYNC_INTERVAL seconds.
+CHUNK_ROWS = 20
+FSYNC_INTERVAL = 5.0
+writer = ChunkedWriter(filename, schema.header,
+                       chunk_rows=CHUNK_ROWS, fsync_interval=FSYNC_INTERVAL,
+                       binary_path=filename[:-len('.csv')] + '.bin',
+                       meta={'windspeed': windspeed, 'schema': 'step04', 'rpm_margins': [rpm_high, rpm_low],
+                             'rload': rload_str, 'started': now})
+
+# Status line refresh rate (Hz). The port is read on a separate thread, so a slow console
+# only delays the display, never the serial reads.
+STATUS_HZ = 5
+
+
+def write_frames(frames):
+    """Append decoded frames to the CSV in the step04 column order."""
+    writer.write(schema.rows(frames, windspeed))
+
+
+reader = SerialReader(ser, decoder)
+reader.start()
+
 # now the loop doesn't stop until KeyboardInterrupt is given
 try:
-    while (True):
-        # Read the size of the struct from Arduino
-        struct_format = 'fffffff'
-        size = struct.calcsize(struct_format)
-        data = ser.read(size)
-
-        if len(data) == size:
-            # Unpack the received data into a tuple
-            unpacked_data = struct.unpack(struct_format, data)
-            timestamp, voltage, current, power, rpm, pitch, load_setting = unpacked_data
-            
-            times.append(timestamp)
-            voltages.append(voltage)
-            currents.append(current)
-            powers.append(power)
-            rpms.append(rpm)
-            pitches.append(pitch)
-            load_settings.append(load_setting)
-            time_str = "{:>6.2f}".format(timestamp)
-            voltage_str = "{:>6.2f}".format(voltage)
-            current_str = "{:>6.2f}".format(current)
-            power_str = "{:>6.2f}".format(power)
-            rpm_str = "{:>6.0f}".format(rpm)
-            pitch_str = "{:>6.0f}".format(pitch)
-            load_setting_str = "{:>6.0f}".format(load_setting)
-
-            print("time: " + time_str, end=" ")
-            print("Voltage (V): " + voltage_str, end=" ")
-            print(", Current (A): " + current_str, end=" ")
-            print(", Power (W): " + power_str, end=" ")
-            print(", RPM: " + rpm_str, end=" ")
-            print(", Pitch: " + pitch_str, end=" ")
-            print(", Load setting: " + load_setting_str)
+    while reader.running:
+        time.sleep(1 / STATUS_HZ)
+        frames = reader.drain()
+        if len(frames) == 0:
+            continue
+        write_frames(frames)
+
+        # One compact status line with the latest frame, rewritten in place
+        timestamp, voltage, current, power, rpm, pitch, load_setting = frames[-1].tolist()
+        ring = reader.stats()
+        print(f"\rtime: {timestamp:>8.2f} | {voltage:>6.2f} V {current:>6.2f} A {power:>6.2f} W | "
+              f"RPM: {rpm:>6.0f} | Pitch: {pitch:>5.0f} | Load: {load_setting:>4.0f} | "
+              f"frames: {decoder.stats()['frames']} overflow: {ring['overflowed']} "
+              f"lag: {ring['latency_last'] * 1000:.0f}/{ring['latency_max'] * 1000:.0f} ms",
+              end="", flush=True)
+    if reader.error is not None:
+        print(f"\nERROR : serial reader stopped: {reader.error!r}")
 except KeyboardInterrupt:
     print("\nInterrupted by user, saving…")
 
-times, voltages, currents, powers = np.array(times), np.array(voltages), np.array(currents), np.array(powers)
-rpms, pitches, load_settings = np.array(rpms), np.array(pitches), np.array(load_settings)
-windspeeds = np.full(len(voltages), windspeed)
-resistances = np.divide(voltages, currents, where=currents!=0)  # Avoid division by zero
-
-combined_array = np.column_stack((windspeeds, pitches, times, voltages, currents, resistances, powers, rpms, load_settings))
-# combined_array = combined_array[:-1]
-
-# Save CSV with two decimal precision
-np.savetxt(filename, combined_array, delimiter=',', 
-           header='Windspeed (m/s), Pitch, Time, Voltage (V), Current (A), Resistance (ohm), Power (W), RPM, Load Setting', 
-           comments='', fmt='%.2f')
-print(f"SUCCESS : {filename} is saved for windspeed = {windspeed} m/s")
+finally:
+    # Also on a serial or decode error: the last chunk is written and fsync'ed
+    reader.stop()
+    try:
+        write_frames(reader.drain())
+    finally:
+        writer.close()
+    print(f"SUCCESS : {filename} is saved for windspeed = {windspeed} m/s ({writer.rows_written} rows)")
+    stats = decoder.stats()
+    print(f"INFO : {stats['frames']} frames, {stats['resyncs']} resyncs, "
+          f"{stats['dropped_bytes']} bytes dropped, {stats['text_lines']} text lines")
+    ring = reader.stats()
+    print(f"INFO : ring overflowed {ring['overflowed']} frames, latency mean {ring['latency_mean'] * 1000:.1f} ms, "
+          f"max {ring['latency_max'] * 1000:.1f} ms")
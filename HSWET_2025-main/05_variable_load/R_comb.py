@@ -6,6 +6,9 @@ resistor_values = [3.0, 11.0, 40.0, 45.0, 59.0, 115.0, 158.0, 236.0]
 #resistor_values = [3.0, 11.0, 24.0, 56.0, 145.0, 224.0, 262.0, 310.0, 332.0, 349.0, 465.0]     #11 2048
 #resistor_values = [3.0, 9.0, 19.0, 61.0, 63.0, 115.0, 261.0, 310.0, 387.0, 413.0, 445.0, 500.0]#12 4096
 
+# Resistors whose FET has failed (bit i = resistor_values[i]); their combinations are left out.
+excluded_mask = 0x00
+
 print("resistor_values =", resistor_values)
 
 # List to hold tuples of (mask, effective resistance)
@@ -13,6 +16,8 @@ combinations = []
 
 # Calculate effective resistance for each mask (0x00 to 0xFF)
 for mask in range(pow(2, len(resistor_values))):
+    if mask & excluded_mask:
+        continue
     if mask == 0:
         effective = float('inf')  # Open circuit when no resistor is selected.
     else:
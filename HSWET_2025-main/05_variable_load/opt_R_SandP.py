@@ -2,6 +2,10 @@ import numpy as np
 import matplotlib.pyplot as plt
 import random
 import math
+import heapq
+from functools import lru_cache
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # --- Helper Functions for Partitioning ---
 
@@ -26,20 +30,41 @@ def compute_block_effective_values(block_values):
     (i.e. the block is shorted out).
     For any nonzero mask, the effective resistance is:
          R_eff = 1 / (sum(1/R_i) for each resistor i turned on)
+    Tables are memoized on the block's resistor values (see block_effective_table).
+    """
+    return block_effective_table(tuple(block_values))
+
+@lru_cache(maxsize=1024)
+def block_effective_table(block_values):
+    """
+    Vectorized, LRU-cached effective-resistance table for one block (a tuple of values),
+    indexed by switch mask. Reciprocals are accumulated in resistor order, so the values
+    are identical to summing them one mask at a time. The returned array is read-only
+    because it is shared between calls.
     """
     k = len(block_values)
-    eff_values = []
-    for mask in range(0, 2**k):  # include mask 0
-        if mask == 0:
-            # Block is off (shorted): effective resistance is 0 Ω.
-            eff_values.append(0.0)
-        else:
-            sum_recip = 0.0
-            for i in range(k):
-                if mask & (1 << i):
-                    sum_recip += 1.0 / block_values[i]
-            eff_values.append(1.0 / sum_recip)
-    return np.array(eff_values)
+    masks = np.arange(2**k)
+    sum_recip = np.zeros(2**k)
+    for i, value in enumerate(block_values):
+        sum_recip += ((masks >> i) & 1) * (1.0 / value)
+    eff = np.zeros(2**k)
+    # Mask 0: block is off (shorted), effective resistance 0 Ω.
+    eff[1:] = 1.0 / sum_recip[1:]
+    eff.setflags(write=False)
+    return eff
+
+@lru_cache(maxsize=256)
+def _series_prefix_values(blocks):
+    """
+    Cartesian sum of the tables of the first len(blocks) series blocks (a tuple of tuples).
+    Cached per prefix, so when perturb_blocks changes block j only blocks j onward are rebuilt.
+    """
+    table = block_effective_table(blocks[-1])
+    if len(blocks) == 1:
+        return table
+    overall = np.add.outer(_series_prefix_values(blocks[:-1]), table).flatten()
+    overall.setflags(write=False)
+    return overall
 
 def compute_overall_effective_values(blocks):
     """
@@ -47,12 +72,9 @@ def compute_overall_effective_values(blocks):
     effective resistances. For each block, compute its set of effective resistances (now including
     the off-state, which is 0 Ω), and since blocks are in series, the overall effective resistance is
     the sum (Cartesian sum) of one effective value per block.
+    Block tables and series prefixes are cached, so unchanged leading blocks are reused.
     """
-    block_effects = [compute_block_effective_values(block) for block in blocks]
-    overall = block_effects[0]
-    for be in block_effects[1:]:
-        overall = np.add.outer(overall, be).flatten()  # Cartesian sum over series blocks
-    return overall
+    return _series_prefix_values(tuple(tuple(block) for block in blocks))
 
 # --- Cost Function (Linearity in Target Region) ---
 
@@ -97,6 +119,115 @@ def cost_function_topology(blocks, region_min, region_max, min_effective_count=5
     return total_cost
 
 
+# Below this many overall values the exact cost is cheaper than the histogram estimate.
+FAST_COST_MIN_COMBINATIONS = 2**14
+
+@lru_cache(maxsize=1024)
+def _block_histogram(block_values, width, length):
+    """
+    Histogram of one block's effective values on a grid of `width` ohms (values rounded to
+    the nearest grid point), truncated to the first `length` grid points. Cached like
+    block_effective_table.
+    """
+    grid_index = np.rint(block_effective_table(block_values) / width).astype(np.int64)
+    hist = np.bincount(grid_index[grid_index < length], minlength=length).astype(np.float64)
+    hist.setflags(write=False)
+    return hist
+
+def cost_function_topology_fast(blocks, region_min, region_max, min_effective_count=50,
+                                penalty_weight=1.5, bins=512):
+    """
+    Approximate cost_function_topology without building the Cartesian sum.
+    
+    Each block's values are rounded to a grid of (region_max - region_min) / bins ohms and
+    histogrammed. Blocks are in series, so the histogram of the overall values is the
+    convolution of the block histograms; everything above region_max can be dropped
+    early because block values are never negative. The cost of this does not depend on
+    how many overall combinations there are.
+    
+    Within each grid bin the values are assumed to be evenly spread, which gives the count,
+    the first/last value (range coverage) and every gap inside a bin or between
+    neighbouring non-empty bins, and hence the spacing variance. Values are only resolved
+    to about len(blocks) / 2 grid steps, so this is meant for exploration in
+    optimize_topology(fast=True), where the finalists are re-scored exactly.
+    """
+    desired_range = region_max - region_min
+    width = desired_range / bins
+    length = int(region_max / width) + 1
+    
+    hist = None
+    for block in blocks:
+        block_hist = _block_histogram(tuple(block), width, length)
+        hist = block_hist if hist is None else np.convolve(hist, block_hist)[:length]
+    
+    start = int(math.ceil(region_min / width))
+    counts = hist[start:]
+    count = int(round(counts.sum()))
+    
+    if count < min_effective_count:
+        count_penalty = penalty_weight * (min_effective_count - count) ** 2
+    else:
+        count_penalty = 0.0
+    
+    if count < 2:
+        return 1e6
+    
+    occupied = np.nonzero(counts > 0.5)[0]
+    c = counts[occupied]
+    step = width / c
+    # (c - 1) gaps of width / c inside every occupied bin ...
+    sum_sq = np.sum((c - 1) * step ** 2)
+    # ... plus one gap from the last value of a bin to the first value of the next occupied bin.
+    low_edge = (start + occupied - 0.5) * width
+    first = low_edge + 0.5 * step
+    last = low_edge + width - 0.5 * step
+    sum_sq += np.sum((first[1:] - last[:-1]) ** 2)
+    
+    range_coverage = last[-1] - first[0]
+    mean_diff = range_coverage / (count - 1)
+    var_diffs = max(sum_sq / (count - 1) - mean_diff ** 2, 0.0)
+    
+    range_penalty = (desired_range - range_coverage) ** 2
+    
+    total_cost = var_diffs + range_penalty + count_penalty
+    return total_cost
+
+
+def cost_lower_bound_topology(partition, R_min, R_max, region_min, region_max,
+                              min_effective_count=50, penalty_weight=1.5):
+    """
+    Cheap lower bound on cost_function_topology for ANY resistor values in [R_min, R_max]
+    arranged as the given partition (block sizes). Used to prune hopeless topologies
+    before annealing them.
+    
+    Bounds used:
+      - count: the blocks give at most prod(2^k) overall values, one of which is the
+        all-off 0 Ω value (outside the region when region_min > 0).
+      - range: the smallest nonzero value is at least min(R_min / k) over the blocks
+        (all resistors of one block at R_min in parallel), and the largest is at most
+        len(partition) * R_max (one R_max resistor on in every block).
+      - spacing variance is >= 0.
+    """
+    count_max = 2 ** sum(partition)
+    if region_min > 0:
+        count_max -= 1
+    lowest = max(region_min, min(R_min / k for k in partition))
+    highest = min(region_max, len(partition) * R_max)
+    
+    # Same early-out as cost_function_topology when fewer than 2 values can land in the region.
+    if count_max < 2 or highest <= lowest:
+        return 1e6
+    
+    count_penalty = 0.0
+    if count_max < min_effective_count:
+        count_penalty = penalty_weight * (min_effective_count - count_max) ** 2
+    
+    desired_range = region_max - region_min
+    range_penalty = max(desired_range - (highest - lowest), 0.0) ** 2
+    
+    return range_penalty + count_penalty
+
+
 # --- Simulated Annealing on Resistor Values for a Given Topology ---
 
 def perturb_blocks(blocks, R_min, R_max):
@@ -113,12 +244,25 @@ def perturb_blocks(blocks, R_min, R_max):
     new_blocks[block_index][resistor_index] = round(new_value)
     return new_blocks
 
-def optimize_topology(partition, R_min, R_max, region_min, region_max, iterations=10000):
+def optimize_topology(partition, R_min, R_max, region_min, region_max, iterations=10000,
+                      fast=False, top_k=10, abort=None):
     """
     For a given topology (partition, e.g. [6,3,3] for N=12), initialize each resistor with a median value
     and optimize (via simulated annealing) the resistor values to minimize the cost function.
     Returns the optimized blocks (list of lists) and the best cost.
+    
+    With fast=True the anneal is driven by cost_function_topology_fast, the top_k distinct
+    configurations it visits are kept, and those finalists are re-scored with the exact
+    cost_function_topology; the best exact one is returned. Partitions with at most
+    FAST_COST_MIN_COMBINATIONS overall values are cheaper to score exactly, so they
+    always use the exact cost.
+    
+    abort(best_cost), if given, is called every iterations // 10 iterations; when it
+    returns True the anneal stops there and the best configuration so far is returned.
     """
+    fast = fast and 2 ** sum(partition) > FAST_COST_MIN_COMBINATIONS
+    cost_fn = cost_function_topology_fast if fast else cost_function_topology
+    
     # Initialize each block with all resistor values set to the median value.
     initial_value = (R_min + R_max) // 2
     blocks = []
@@ -126,26 +270,167 @@ def optimize_topology(partition, R_min, R_max, region_min, region_max, iteration
         blocks.append([initial_value] * size)
     
     current_blocks = blocks
-    current_cost = cost_function_topology(current_blocks, region_min, region_max)
+    current_cost = cost_fn(current_blocks, region_min, region_max)
     best_blocks = current_blocks
     best_cost = current_cost
+    # Finalists for fast mode: max-heap (by negated cost) of the top_k configurations seen.
+    finalists = []
+    finalist_keys = set()
+    
+    def keep_finalist(cand_blocks, cost):
+        key = tuple(tuple(b) for b in cand_blocks)
+        if key in finalist_keys:
+            return
+        if len(finalists) < top_k:
+            heapq.heappush(finalists, (-cost, key))
+            finalist_keys.add(key)
+        elif cost < -finalists[0][0]:
+            _, dropped = heapq.heapreplace(finalists, (-cost, key))
+            finalist_keys.discard(dropped)
+            finalist_keys.add(key)
+    
+    if fast:
+        keep_finalist(current_blocks, current_cost)
     T = 1.0
     T_min = 1e-6
     alpha = 0.999
+    check_every = max(iterations // 10, 1)
     for it in range(iterations):
+        if abort is not None and it % check_every == 0 and abort(best_cost):
+            break
         candidate_blocks = perturb_blocks(current_blocks, R_min, R_max)
-        candidate_cost = cost_function_topology(candidate_blocks, region_min, region_max)
+        candidate_cost = cost_fn(candidate_blocks, region_min, region_max)
         if candidate_cost < current_cost or random.random() < math.exp(-(candidate_cost - current_cost) / T):
             current_blocks = candidate_blocks
             current_cost = candidate_cost
+            if fast:
+                keep_finalist(candidate_blocks, candidate_cost)
             if candidate_cost < best_cost:
                 best_cost = candidate_cost
                 best_blocks = candidate_blocks
         T = max(T * alpha, T_min)
+    
+    if fast:
+        # Re-score the finalists with the exact cost.
+        rescored = [(cost_function_topology(key, region_min, region_max), [list(b) for b in key])
+                    for _, key in finalists]
+        best_cost, best_blocks = min(rescored, key=lambda item: item[0])
     return best_blocks, best_cost
 
 # --- Overall Search Over Topologies ---
 
+# Best exact cost found so far by the running search, shared with the pool workers
+# (a multiprocessing.Value, set by _init_worker).
+_incumbent = None
+
+def _init_worker(incumbent):
+    global _incumbent
+    _incumbent = incumbent
+
+def _optimize_partition(partition, seed, R_min, R_max, region_min, region_max, iterations, fast=False,
+                        bound=None):
+    """
+    Worker for search_topologies: seed this process's RNG for the partition and anneal it.
+    Seeding per partition (not per worker) keeps results reproducible no matter which
+    worker picks the partition up or in which order partitions finish.
+    Returns (partition, blocks, cost, aborted); aborted is True when the anneal was
+    abandoned because the partition's lower bound (if given) exceeds the incumbent.
+    """
+    random.seed(seed)
+    aborted = False
+    
+    def abort(best_cost):
+        nonlocal aborted
+        aborted = bound is not None and _incumbent is not None and bound > _incumbent.value
+        return aborted
+    
+    blocks, cost = optimize_topology(partition, R_min, R_max, region_min, region_max, iterations, fast=fast,
+                                     abort=abort)
+    return partition, blocks, cost, aborted
+
+def search_topologies(N, R_min, R_max, region_min, region_max, iterations=5000, max_blocks=4,
+                      workers=None, seed=0, on_result=None, prune=True, fast=False):
+    """
+    Optimize every topology (partition of N with at most max_blocks blocks) and return the best one.
+    
+    Partitions are independent, so they are spread over a ProcessPoolExecutor with `workers`
+    processes (None = one per CPU, 1 = run serially in this process). Partition i is annealed
+    with RNG seed `seed + i`, so a given seed always gives the same results.
+    
+    With prune=True, partitions are run in order of cost_lower_bound_topology, and any
+    partition whose bound is already worse than the best cost found so far is skipped
+    (queued pool jobs are cancelled). Partitions already annealing in the pool check the
+    bound against the incumbent shared by the workers every tenth of their iterations,
+    and are abandoned (counted as pruned, no on_result call) once it is worse. A pruned
+    partition cannot beat the incumbent, so pruning never changes the result; which
+    partitions are pruned in the pool can depend on finishing order. The bound is 0 for
+    every partition when R_min is small (e.g. N=12, R_min=1), and then nothing is pruned.
+    
+    fast=True anneals each partition with the approximate cost (see optimize_topology);
+    reported costs are always exact.
+    
+    on_result(partition, blocks, cost) is called for every partition as soon as it finishes.
+    Returns (best_partition, best_blocks, best_cost, pruned) where pruned is the number of
+    partitions that were skipped or abandoned.
+    """
+    candidates = [p for p in partitions(N, 1) if len(p) <= max_blocks]
+    bounds = [cost_lower_bound_topology(p, R_min, R_max, region_min, region_max) if prune else 0.0
+              for p in candidates]
+    # Most promising partitions first, so a good incumbent is found early.
+    order = sorted(range(len(candidates)), key=lambda i: bounds[i])
+    jobs = [(candidates[i], seed + i, R_min, R_max, region_min, region_max, iterations, fast,
+             bounds[i] if prune else None)
+            for i in order]
+    
+    best_cost = 1e9
+    best_blocks = None
+    best_partition = None
+    pruned = 0
+    incumbent = multiprocessing.Value('d', math.inf)
+    
+    def collect(partition, blocks, cost, aborted):
+        nonlocal best_cost, best_blocks, best_partition, pruned
+        if aborted:
+            pruned += 1
+            return
+        if on_result is not None:
+            on_result(partition, blocks, cost)
+        # Ties go to the earlier partition so the result does not depend on finishing order.
+        if best_partition is None or cost < best_cost or (
+                cost == best_cost and candidates.index(partition) < candidates.index(best_partition)):
+            best_cost = cost
+            best_blocks = blocks
+            best_partition = partition
+            incumbent.value = best_cost
+    
+    def hopeless(i):
+        return prune and best_partition is not None and bounds[i] > best_cost
+    
+    if workers == 1:
+        _init_worker(incumbent)
+        for i, job in zip(order, jobs):
+            if hopeless(i):
+                pruned += 1
+                continue
+            collect(*_optimize_partition(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(incumbent,)) as pool:
+            futures = {pool.submit(_optimize_partition, *job): i for i, job in zip(order, jobs)}
+            cancelled = set()
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                collect(*future.result())
+                # Drop queued partitions that can no longer beat the new incumbent
+                # (cancel() is also True for a future cancelled before: count it once).
+                for other, i in futures.items():
+                    if other not in cancelled and hopeless(i) and other.cancel():
+                        cancelled.add(other)
+                        pruned += 1
+    
+    return best_partition, best_blocks, best_cost, pruned
+
 if __name__ == "__main__":
     # Parameters
     N = 12  # Total number of resistors
@@ -154,28 +439,23 @@ if __name__ == "__main__":
     region_min = 2   # Target effective resistance region: lower bound (ohms)
     region_max = 40.0  # Target effective resistance region: upper bound (ohms)
     iterations = 5000  # Annealing iterations per topology
+    workers = None  # Worker processes for the search (None = all CPUs)
+    seed = 0  # Base RNG seed; partition i uses seed + i
     
-    best_overall_cost = 1e9
-    best_overall_config = None
-    best_partition = None
+    def report(partition, blocks, cost):
+        print(" Partition:", partition, "Cost:", cost, "Optimized blocks:", blocks)
     
     print("Searching over candidate topologies (partitions of {}):".format(N))
     # Enumerate candidate partitions (topologies). We limit to partitions with up to 4 blocks.
-    for partition in partitions(N, 1):
-        if len(partition) > 4:
-            continue
-        print("Trying partition:", partition)
-        optimized_blocks, cost_val = optimize_topology(partition, R_min, R_max, region_min, region_max, iterations)
-        print(" Partition:", partition, "Cost:", cost_val, "Optimized blocks:", optimized_blocks)
-        if cost_val < best_overall_cost:
-            best_overall_cost = cost_val
-            best_overall_config = optimized_blocks
-            best_partition = partition
-            
+    best_partition, best_overall_config, best_overall_cost, pruned = search_topologies(
+        N, R_min, R_max, region_min, region_max, iterations,
+        max_blocks=4, workers=workers, seed=seed, on_result=report)
+    
     print("\nBest overall configuration found:")
     print(" Partition (block sizes):", best_partition)
     print(" Resistor values per block:", best_overall_config)
     print(" Achieved cost:", best_overall_cost)
+    print(" Partitions pruned (lower bound or abandoned):", pruned)
     
     # Optionally, compute and display the overall effective resistance distribution for the best configuration:
     overall_eff = compute_overall_effective_values(best_overall_config)
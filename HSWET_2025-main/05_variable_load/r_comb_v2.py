@@ -16,6 +16,8 @@ The list is sorted by Req. Then, plots the Req values using matplotlib.
 """
 
 import itertools
+import heapq
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -116,21 +118,188 @@ def generate_all_configurations():
       - Block 3: For a multi-resistor block with 10 resistors, generate 1 (off) + (2^10 - 1) = 1 + 1023 = 1024 possibilities.
     Total combinations: 2 * 2 * 1024 = 4096.
     
-    Returns a list of entries [[configuration], Req].
+    Returns a list of entries [[configuration], Req]. This is a list view of
+    enumerate_configurations, which should be preferred for anything large.
     """
-    block1_configs = generate_block_configurations(block1)
-    block2_configs = generate_block_configurations(block2)
-    block3_configs = generate_block_configurations(block3)
+    blocks = [block1, block2, block3]
+    masks, reqs = enumerate_configurations(blocks)
+    width = sum(block_switch_width(block) for block in blocks)
+    return [[mask_to_config(mask, width), float(Req)] for mask, Req in zip(masks, reqs)]
+
+# --- Vectorized Enumeration (packed masks) ---
+def block_switch_width(block):
+    """Number of switches in a block: 1 for a single resistor, else block switch + one per resistor."""
+    return 1 if len(block) == 1 else 1 + len(block)
+
+def block_configuration_count(block, local_exclude=0):
+    """
+    Number of configurations of the block that close no switch in local_exclude (the
+    block's own bits, laid out as in block_configuration_arrays).
+    """
+    if len(block) == 1:
+        return 1 if local_exclude & 1 else 2
+    n = len(block)
+    if (local_exclude >> n) & 1:
+        return 1  # block switch unusable: only the off configuration
+    free = ~local_exclude & ((1 << n) - 1)
+    return 2 ** bin(free).count('1')  # off + every nonempty set of usable resistors
+
+def block_configurations_at(block, index, local_exclude=0):
+    """
+    Configurations number `index` (an int array) of the block, counting only those that
+    close no switch in local_exclude, in the order of generate_block_configurations.
+    Computed from the index bits, without the block's table, so a large block can be
+    streamed a chunk at a time. Returns (masks, reqs) like block_configuration_arrays.
+    """
+    index = np.asarray(index, dtype=np.uint64)
+    if len(block) == 1:
+        return index.astype(np.uint32), index * float(block[0])
+    n = len(block)
+    # Number k > 0 is the k-th nonempty set of usable resistors: spread its bits over the
+    # usable bit positions, which keeps the sets in increasing mask order.
+    free = ~local_exclude & ((1 << n) - 1)
+    internal = np.zeros(len(index), dtype=np.uint64)
+    for j, bit in enumerate(b for b in range(n) if (free >> b) & 1):
+        internal |= ((index >> np.uint64(j)) & np.uint64(1)) << np.uint64(bit)
+    sum_recip = np.zeros(len(index))
+    # Accumulate in resistor order, exactly like effective_resistance_block.
+    for i, r in enumerate(block):
+        sum_recip += ((internal >> np.uint64(n - 1 - i)) & np.uint64(1)) * (1.0 / r)
+    on = index > 0
+    masks = np.where(on, internal | np.uint64(1 << n), np.uint64(0)).astype(np.uint32)
+    reqs = np.divide(1.0, sum_recip, out=np.zeros(len(index)), where=on)
+    return masks, reqs
+
+def block_configuration_arrays(block):
+    """
+    NumPy version of generate_block_configurations + effective_resistance_block.
+    Returns (masks, reqs) for the block, in the same order as generate_block_configurations.
+    Each mask packs the block's switch list with the first switch as the most significant bit,
+    so for a multi-resistor block the block switch is bit n and resistor i is bit n - 1 - i.
+    """
+    return block_configurations_at(block, np.arange(block_configuration_count(block)))
+
+def block_layout(blocks, exclude_mask=0):
+    """
+    (shifts, local_excludes): block j's bit offset in the overall masks and the part of
+    exclude_mask (same packed layout, as BAD_FET_MASK in the firmware) that falls in it.
+    """
+    widths = [block_switch_width(block) for block in blocks]
+    shifts = [sum(widths[j + 1:]) for j in range(len(blocks))]
+    local_excludes = [(int(exclude_mask) >> shift) & ((1 << width) - 1)
+                      for width, shift in zip(widths, shifts)]
+    return shifts, local_excludes
+
+def usable_block_tables(blocks, exclude_mask=0):
+    """
+    Per-block (masks, reqs) tables with every configuration that closes an excluded switch
+    removed. exclude_mask uses the same packed layout as the overall masks (and as
+    BAD_FET_MASK in the firmware), so a failed FET is dropped before any Cartesian product
+    is formed. Returns (tables, shifts) where shifts[j] is block j's bit offset.
+    """
+    shifts, local_excludes = block_layout(blocks, exclude_mask)
+    tables = [block_configurations_at(block, np.arange(block_configuration_count(block, exclude)), exclude)
+              for block, exclude in zip(blocks, local_excludes)]
+    return tables, shifts
+
+def enumerate_configurations(blocks, exclude_mask=0):
+    """
+    Vectorized replacement for generate_all_configurations.
+    Builds every overall switch configuration of the series blocks as a packed integer mask
+    (first switch of the first block = most significant bit, the same order used for the
+    hex values in the log) and its overall effective resistance, with broadcasting instead
+    of Python loops.
+    Configurations that use a switch in exclude_mask (e.g. a failed FET) are left out.
+    Returns (masks, reqs): a uint16 array (uint32 if there are more than 16 switches) and a
+    float64 array, in the same order as generate_all_configurations.
+    """
+    mask_dtype = packed_mask_dtype(blocks)
+    tables, shifts = usable_block_tables(blocks, exclude_mask)
+    
+    masks = np.zeros(1, dtype=np.uint64)
+    reqs = np.zeros(1)
+    for (block_masks, block_reqs), shift in zip(tables, shifts):
+        masks = (masks[:, None] | (block_masks[None, :].astype(np.uint64) << np.uint64(shift))).ravel()
+        reqs = np.add.outer(reqs, block_reqs).ravel()
+    return masks.astype(mask_dtype), reqs
+
+def packed_mask_dtype(blocks):
+    """Smallest unsigned integer type that holds every switch of the blocks."""
+    total_width = sum(block_switch_width(block) for block in blocks)
+    if total_width <= 16:
+        return np.uint16
+    return np.uint32 if total_width <= 32 else np.uint64
+
+def iter_configuration_chunks(blocks, chunk_size=2**20, exclude_mask=0):
+    """
+    Streaming version of enumerate_configurations for banks too large to materialize.
+    Yields (masks, reqs) arrays of at most chunk_size configurations, in the same order
+    as enumerate_configurations. Configuration number i is decoded in mixed radix (the
+    last block varies fastest). Blocks with at most chunk_size configurations are looked
+    up in their table, larger ones are decoded per chunk (block_configurations_at), so
+    memory use depends only on chunk_size, even for a single 24-resistor block.
+    """
+    shifts, local_excludes = block_layout(blocks, exclude_mask)
+    counts = [block_configuration_count(block, exclude) for block, exclude in zip(blocks, local_excludes)]
+    tables = [block_configurations_at(block, np.arange(count), exclude) if count <= chunk_size else None
+              for block, exclude, count in zip(blocks, local_excludes, counts)]
+    mask_dtype = packed_mask_dtype(blocks)
+    total = int(np.prod(counts))
+    
+    for start in range(0, total, chunk_size):
+        remaining = np.arange(start, min(start + chunk_size, total), dtype=np.int64)
+        block_index = [None] * len(blocks)
+        for j in reversed(range(len(blocks))):
+            remaining, block_index[j] = np.divmod(remaining, counts[j])
+        
+        masks = np.zeros(len(remaining), dtype=np.uint64)
+        reqs = np.zeros(len(remaining))
+        # Sum block by block in order, like enumerate_configurations.
+        for j, (k, shift) in enumerate(zip(block_index, shifts)):
+            if tables[j] is not None:
+                block_masks, block_reqs = tables[j][0][k], tables[j][1][k]
+            else:
+                block_masks, block_reqs = block_configurations_at(blocks[j], k, local_excludes[j])
+            masks |= block_masks.astype(np.uint64) << np.uint64(shift)
+            reqs = reqs + block_reqs
+        yield masks.astype(mask_dtype), reqs
+
+def build_region_table(blocks, region_min, region_max, buckets, chunk_size=2**20, exclude_mask=0):
+    """
+    Build a lookup table over [region_min, region_max] in constant memory.
+    The region is split into `buckets` equal buckets and, while streaming through
+    iter_configuration_chunks, only the configuration closest to each bucket's centre is
+    kept (ties go to the earlier configuration). Returns (masks, reqs) for the non-empty
+    buckets, sorted by Req. Switches in exclude_mask are never used.
+    """
+    width = (region_max - region_min) / buckets
+    best_dist = np.full(buckets, np.inf)
+    best_mask = np.zeros(buckets, dtype=packed_mask_dtype(blocks))
+    best_req = np.zeros(buckets)
     
-    all_configurations = []
-    # Iterate over the Cartesian product of configurations for each block.
-    for conf1 in block1_configs:
-        for conf2 in block2_configs:
-            for conf3 in block3_configs:
-                overall_conf = conf1 + conf2 + conf3
-                Req = overall_effective_resistance(overall_conf, [block1, block2, block3])
-                all_configurations.append([overall_conf, Req])
-    return all_configurations
+    for masks, reqs in iter_configuration_chunks(blocks, chunk_size, exclude_mask):
+        in_region = (reqs >= region_min) & (reqs <= region_max)
+        masks, reqs = masks[in_region], reqs[in_region]
+        bucket = np.minimum(((reqs - region_min) / width).astype(np.int64), buckets - 1)
+        dist = np.abs(reqs - (region_min + (bucket + 0.5) * width))
+        # Best candidate per bucket within this chunk: sort by (bucket, dist), take the first.
+        order = np.lexsort((dist, bucket))
+        bucket, dist, masks, reqs = bucket[order], dist[order], masks[order], reqs[order]
+        first = np.unique(bucket, return_index=True)[1]
+        bucket, dist, masks, reqs = bucket[first], dist[first], masks[first], reqs[first]
+        # Merge with the running best.
+        better = dist < best_dist[bucket]
+        bucket = bucket[better]
+        best_dist[bucket] = dist[better]
+        best_mask[bucket] = masks[better]
+        best_req[bucket] = reqs[better]
+    
+    filled = np.isfinite(best_dist)
+    return best_mask[filled], best_req[filled]
+
+def mask_to_config(mask, width):
+    """Unpack a packed mask back into the [switch, ...] list used by generate_all_configurations."""
+    return [(int(mask) >> (width - 1 - i)) & 1 for i in range(width)]
 
 import numpy as np
 
@@ -175,25 +344,148 @@ def linearize_data(data, tolerance=0.87, use_max_step=True):
     return filtered_data
 
 
+def min_points_for_max_gap(values, max_gap):
+    """
+    Fewest points of sorted `values` (always keeping the first and last) such that no two
+    consecutive chosen points are more than max_gap apart, choosing greedily the farthest
+    reachable point each time. Returns None if some gap in the data is already larger.
+    """
+    last = len(values) - 1
+    i, count = 0, 1
+    while i < last:
+        j = int(np.searchsorted(values, values[i] + max_gap, side='right')) - 1
+        if j <= i:
+            return None
+        i, count = j, count + 1
+    return count
+
+def select_linear_subset(values, count, sweeps=20):
+    """
+    Replacement for linearize_data: choose exactly `count` of the sorted `values` (e.g. the
+    543 entries the firmware table holds), always keeping the first and last one, so that
+    the chosen values are as evenly spaced as possible.
+    
+      1. Binary search on the answer for the smallest maximum spacing D that can be met
+         with at most `count` points (min_points_for_max_gap is monotone in D).
+      2. Take the greedy points for D and, while there are fewer than `count`, split the
+         current largest gap with the value closest to its midpoint.
+      3. Relaxation sweeps: move each interior point to the value closest to the midpoint
+         of its neighbours (even and odd points alternately, vectorized). This never
+         increases the maximum spacing and only lowers the sum of squared spacings, i.e.
+         the spacing variance.
+    
+    Each feasibility check costs O(count log n), so this runs in O(n log n) overall on
+    10^5-10^6 candidates. Returns the sorted indices of the chosen values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if count >= n:
+        return np.arange(n)
+    if count < 2:
+        raise ValueError("count must be at least 2 to keep both ends of the range")
+    
+    # 1. Smallest achievable maximum spacing.
+    def feasible(max_gap):
+        # None: values[i] + max_gap rounded below the next value, so max_gap is too small
+        points = min_points_for_max_gap(values, max_gap)
+        return points is not None and points <= count
+    
+    lo = np.max(np.diff(values))  # no subset can beat the largest gap in the data
+    hi = values[-1] - values[0]
+    if feasible(lo):
+        hi = lo
+    for _ in range(100):
+        if hi - lo <= 1e-12 * max(hi, 1.0):
+            break
+        mid = 0.5 * (lo + hi)
+        if feasible(mid):
+            hi = mid
+        else:
+            lo = mid
+    
+    # 2. Greedy points for that spacing, then fill up to `count` by splitting the largest gaps.
+    chosen = [0]
+    while chosen[-1] < n - 1:
+        # At least one step, in case the full range rounds below the last value
+        step = int(np.searchsorted(values, values[chosen[-1]] + hi, side='right')) - 1
+        chosen.append(max(step, chosen[-1] + 1))
+    chosen = set(chosen)
+    gaps = [(-(values[b] - values[a]), a, b) for a, b in zip(sorted(chosen), sorted(chosen)[1:])]
+    heapq.heapify(gaps)
+    while len(chosen) < count and gaps:
+        _, a, b = heapq.heappop(gaps)
+        if b - a < 2:
+            continue  # nothing between a and b to split with
+        c = int(_closest_index_between(values, 0.5 * (values[a] + values[b]), a, b))
+        chosen.add(c)
+        heapq.heappush(gaps, (-(values[c] - values[a]), a, c))
+        heapq.heappush(gaps, (-(values[b] - values[c]), c, b))
+    idx = np.array(sorted(chosen))
+    
+    # 3. Relaxation sweeps toward neighbour midpoints.
+    for _ in range(sweeps):
+        moved = False
+        for parity in (1, 2):
+            k = np.arange(parity, len(idx) - 1, 2)
+            left, right = idx[k - 1], idx[k + 1]
+            target = 0.5 * (values[left] + values[right])
+            new = _closest_index_between(values, target, left, right)
+            moved |= bool(np.any(new != idx[k]))
+            idx[k] = new
+        if not moved:
+            break
+    return idx
+
+def _closest_index_between(values, target, left, right):
+    """Index of the value closest to target strictly between indices left and right (vectorized)."""
+    upper = np.clip(np.searchsorted(values, target), left + 1, right - 1)
+    lower = np.clip(upper - 1, left + 1, right - 1)
+    return np.where(np.abs(values[lower] - target) <= np.abs(values[upper] - target), lower, upper)
+
+def write_resistor_lookup(masks, reqs, cpp_path="resistor_lookup.cpp", header_path="resistor_lookup.h"):
+    """
+    Write a firmware lookup table (resistor_lookup.cpp/.h, as used by r_target.cpp) for the
+    given packed masks and Req values. The header defines RESISTOR_LOOKUP_SIZE so the
+    firmware loops follow the table length when it is regenerated, e.g. after a FET fails.
+    """
+    with open(header_path, "w") as header:
+        header.write("#ifndef RESISTOR_LOOKUP_H\n"
+                     "#define RESISTOR_LOOKUP_H\n\n"
+                     "#include <stdint.h>\n\n"
+                     "// Structure holding the combination mask and its effective resistance (in ohms).\n"
+                     "struct ResistorCombination {\n"
+                     "  uint16_t mask;      // Each bit indicates whether a resistor is connected.\n"
+                     "  float resistance;   // Effective parallel resistance in ohms.\n"
+                     "};\n\n"
+                     "// Number of entries in resistorLookup (generated by r_comb_v2.py)\n"
+                     "#define RESISTOR_LOOKUP_SIZE %d\n\n"
+                     "// Declaration only – no initializer here\n"
+                     "extern const ResistorCombination resistorLookup[RESISTOR_LOOKUP_SIZE];\n\n"
+                     "#endif // RESISTOR_LOOKUP_H\n" % len(masks))
+    with open(cpp_path, "w") as cpp:
+        cpp.write('#include "resistor_lookup.h"\n\n')
+        cpp.write("const ResistorCombination resistorLookup[RESISTOR_LOOKUP_SIZE] = {\n")
+        for mask, resistance in zip(masks, reqs):
+            cpp.write("  {0x%04X, %s},\n" % (int(mask), float(resistance)))
+        cpp.write("};\n")
+
 if __name__ == '__main__':
-    all_configs = generate_all_configurations()
-    print(f"Generated {len(all_configs)} configurations.")
+    # Switches to leave out of the table (same packed layout as BAD_FET_MASK in r_target.cpp),
+    # e.g. 0b0000010010000 when those two FETs have failed. 0 uses every FET.
+    BAD_FET_MASK = 0b0000000000000
+    masks, Req_values = enumerate_configurations([block1, block2, block3], exclude_mask=BAD_FET_MASK)
+    print(f"Generated {len(masks)} configurations.")
         
-    # filter out any configurations with Req == 0
-    all_configs = [cfg for cfg in all_configs if cfg[1] != 0.0]
-    # Ignore values over 50
-    all_configs = [cfg for cfg in all_configs if cfg[1] <= 40.0]
+    # Filter out any configurations with Req == 0 and ignore values over 40.
+    keep = (Req_values != 0.0) & (Req_values <= 40.0)
+    masks, Req_values = masks[keep], Req_values[keep]
     
-    print(f"Configurations after filtering out Req == 0: {len(all_configs)}")
+    print(f"Configurations after filtering out Req == 0: {len(masks)}")
     
     # Sort configurations by overall effective resistance.
-    all_configs_sorted = sorted(all_configs, key=lambda x: x[1])
-    
-    # Extract Req values for plotting
-    Req_values = [entry[1] for entry in all_configs_sorted]
-    
-    # Assuming Req_values is a sorted list or numpy array of Req values.
-    Req_values = np.array(Req_values)  # e.g., obtained from your sorted configurations
+    order = np.argsort(Req_values, kind='stable')
+    masks, Req_values = masks[order], Req_values[order]
+    all_configs_sorted = list(zip(masks, Req_values))
 
     # Compute differences between adjacent Req values
     diffs = np.diff(Req_values)
@@ -206,7 +498,10 @@ if __name__ == '__main__':
     print(f"This gap occurs between configuration indices {max_index} and {max_index + 1}, " \
           f"with Req values: {Req_values[max_index]:.3f} Ohms and {Req_values[max_index + 1]:.3f} Ohms")
     
-    lin_data = linearize_data(all_configs_sorted)
+    # Pick exactly as many entries as the firmware table holds (resistorLookup[543]),
+    # as evenly spaced as possible, instead of the greedy linearize_data pass.
+    table_size = 543
+    lin_data = [all_configs_sorted[i] for i in select_linear_subset(Req_values, table_size)]
     Req_values_lin = np.array([entry[1] for entry in lin_data])
     
     print(f"Linearized data points: {len(Req_values_lin)}")    
@@ -217,18 +512,23 @@ if __name__ == '__main__':
 
     with open(output_filename, "w") as log_file:
         # Iterate over each configuration and its corresponding resistance.
-        for config, resistance in lin_data:
-            # Convert the binary list to an integer, assuming the first bit is the MSB.
-            hex_val = 0
-            for bit in config:
-                hex_val = (hex_val << 1) | bit
-
-            # Format the integer as a hexadecimal value (zero-padded to at least 4 digits)
-            # and the resistance as a float with six decimal places and an appended 'f'.
-            log_file.write("  {0x%04X, %s},\n" % (hex_val, resistance))
+        for mask, resistance in lin_data:
+            # The mask is already packed with the first switch as the MSB.
+            # Format it as a hexadecimal value (zero-padded to at least 4 digits)
+            # and the resistance as a float.
+            log_file.write("  {0x%04X, %s},\n" % (int(mask), float(resistance)))
 
     print(f"Linearized data has been written to {output_filename}")
     
+    # Firmware table, written into the step01_CWC_var_load sketch next to r_target.cpp.
+    firmware_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "..", "06_final_code", "step01_CWC_var_load")
+    cpp_path = os.path.normpath(os.path.join(firmware_dir, "resistor_lookup.cpp"))
+    header_path = os.path.normpath(os.path.join(firmware_dir, "resistor_lookup.h"))
+    write_resistor_lookup([entry[0] for entry in lin_data], [entry[1] for entry in lin_data],
+                          cpp_path=cpp_path, header_path=header_path)
+    print(f"Firmware table has been written to {cpp_path} / {header_path}")
+    
     # Create a figure with two subplots
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(18, 8), sharex=False)
 
@@ -0,0 +1,39 @@
+import multiprocessing
+
+import opt_R_SandP
+from opt_R_SandP import _init_worker, _optimize_partition, partitions, search_topologies
+
+
+def candidates(N):
+    return [p for p in partitions(N, 1) if len(p) <= 4]
+
+
+def test_anneal_is_abandoned_once_its_bound_exceeds_the_incumbent():
+    args = ([3, 3], 0, 8, 60, 2, 20.0, 400)
+    try:
+        _init_worker(multiprocessing.Value('d', 0.5))
+        assert _optimize_partition(*args, bound=1.0)[3]
+        assert not _optimize_partition(*args, bound=0.25)[3]
+        assert not _optimize_partition(*args)[3]
+    finally:
+        opt_R_SandP._incumbent = None
+
+
+def test_pruning_does_not_change_the_result():
+    # R_min = 8 gives nonzero bounds
+    args = (6, 8, 60, 2, 20.0, 600)
+    finished = []
+    result = search_topologies(*args, workers=1, on_result=lambda p, b, c: finished.append(p))
+    reference = search_topologies(*args, workers=1, prune=False)
+    assert result[:3] == reference[:3]
+    assert result[3] >= 1 and result[3] + len(finished) == len(candidates(6))
+    assert reference[3] == 0
+
+
+def test_pool_counts_each_cancelled_partition_once():
+    # Queued partitions are cancelled by the bound as the incumbent improves
+    args = (6, 8, 60, 2, 20.0, 600)
+    partition, blocks, cost, pruned = search_topologies(*args, workers=2)
+    reference = search_topologies(*args, workers=1, prune=False)
+    assert 1 <= pruned <= len(candidates(6))
+    assert (partition, blocks, cost) == reference[:3]
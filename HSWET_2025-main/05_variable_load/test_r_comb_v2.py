@@ -0,0 +1,53 @@
+import tracemalloc
+
+import numpy as np
+
+from r_comb_v2 import (build_region_table, enumerate_configurations, iter_configuration_chunks,
+                       min_points_for_max_gap, select_linear_subset)
+
+
+def test_select_linear_subset_when_largest_gap_rounds_infeasible():
+    # values[i] + max(diff) rounds below values[i + 1] here, so min_points_for_max_gap
+    # returns None for the starting spacing
+    values = np.array([0.00014243807372356108, 0.00036881328729954224, 0.0003803040951055777,
+                       0.0009280642196927324, 0.001094415836505019])
+    assert min_points_for_max_gap(values, np.max(np.diff(values))) is None
+    for count in range(2, len(values)):
+        idx = select_linear_subset(values, count)
+        assert len(idx) == count
+        assert idx[0] == 0 and idx[-1] == len(values) - 1
+        assert np.all(np.diff(idx) > 0)
+
+
+def test_select_linear_subset_random_sorted_inputs():
+    for trial in range(200):
+        rng = np.random.default_rng(trial)
+        n = int(rng.integers(5, 40))
+        values = np.sort(rng.random(n) * 10 ** rng.uniform(-3, 4))
+        count = int(rng.integers(2, n))
+        idx = select_linear_subset(values, count)
+        assert len(idx) == count
+        assert idx[0] == 0 and idx[-1] == n - 1
+
+
+def test_chunks_decode_blocks_larger_than_a_chunk():
+    # The 7-resistor block has more configurations than a chunk, so it is never tabulated
+    blocks = [[5], [18], [4, 7, 22, 50, 71, 100, 240]]
+    for exclude_mask in (0, 0b0100010010):
+        masks, reqs = enumerate_configurations(blocks, exclude_mask)
+        chunks = list(iter_configuration_chunks(blocks, 50, exclude_mask))
+        assert max(len(chunk_masks) for chunk_masks, _ in chunks) <= 50
+        assert np.array_equal(np.concatenate([chunk_masks for chunk_masks, _ in chunks]), masks)
+        assert np.array_equal(np.concatenate([chunk_reqs for _, chunk_reqs in chunks]), reqs)
+
+
+def test_region_table_memory_is_bounded_by_the_chunk():
+    # A full table of this block is 2^20 entries (tens of MB)
+    blocks = [list(np.linspace(4, 240, 20))]
+    tracemalloc.start()
+    try:
+        build_region_table(blocks, 2, 40, 100, chunk_size=2**12)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 2e6
@@ -9,6 +9,8 @@ Adafruit_INA260 ina260 = Adafruit_INA260();
 const int NUM_FETS = 13;
 const int FETs[NUM_FETS] = {38, 36, 34, 53, 51, 49, 47, 45, 9, 10, 11, 12, 13};
 const uint16_t BAD_FET_MASK = 0b0000010010000; // excludes FETs 6 and 11 (47 and 12)
+// Runtime guard only: regenerate resistor_lookup.cpp with the same mask
+// (BAD_FET_MASK in r_comb_v2.py) so the table has no dead entries to skip.
 
 void applyBitstring(uint16_t bitstring) {
   for (int i = 3; i < 16; ++i) {
@@ -59,7 +61,7 @@ void initialR(int setR) {
 
   float best_diff = 1e9;
   uint16_t best_mask = 0;
-  for (int k = 0; k < 543; ++k) {
+  for (int k = 0; k < RESISTOR_LOOKUP_SIZE; ++k) {
     if (usesBadFET(resistorLookup[k].mask)) continue;
     float diff = abs(setR - resistorLookup[k].resistance);
     if (diff < best_diff) {
@@ -106,7 +108,7 @@ void setResistance(float targetR, int interval, int settlecount, float k) {
   while (attempts++ < maxAttempts) {
     float best_diff = 1e9;
     uint16_t best_mask = 0;
-    for (int k = 0; k < 543; ++k) {
+    for (int k = 0; k < RESISTOR_LOOKUP_SIZE; ++k) {
       if (usesBadFET(resistorLookup[k].mask)) continue;
       float diff = abs(setR - resistorLookup[k].resistance);
       if (diff < best_diff) {
@@ -176,7 +178,7 @@ void testAllResistors(float tolerance = 0.5) {
   }
 
 
-  for (int i = 0; i < 543; ++i) {
+  for (int i = 0; i < RESISTOR_LOOKUP_SIZE; ++i) {
     float targetR = resistorLookup[i].resistance;
     uint16_t mask = resistorLookup[i].mask;
 
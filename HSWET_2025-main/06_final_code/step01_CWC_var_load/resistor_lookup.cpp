@@ -1,6 +1,6 @@
 #include "resistor_lookup.h"
 
-const ResistorCombination resistorLookup[543] = {
+const ResistorCombination resistorLookup[RESISTOR_LOOKUP_SIZE] = {
    {0x07FF, 1.889803820941379},
   {0x07F7, 1.938652800540583},
   {0x07F4, 1.9904609335178036},
@@ -9,7 +9,10 @@ struct ResistorCombination {
   float resistance;   // Effective parallel resistance in ohms.
 };
 
+// Number of entries in resistorLookup (generated by r_comb_v2.py)
+#define RESISTOR_LOOKUP_SIZE 543
+
 // Declaration only – no initializer here
-extern const ResistorCombination resistorLookup[543];
+extern const ResistorCombination resistorLookup[RESISTOR_LOOKUP_SIZE];
 
 #endif // RESISTOR_LOOKUP_H
@@ -1,9 +1,13 @@
 import serial
 import numpy as np 
-import struct
 import datetime
 import time
 import os
+import sys
+
+# Shared logger code lives in HSWET_2025-main/hswet_logger
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from hswet_logger import ChunkedWriter, FrameClock, get_schema
 
 # ----------------------------[USER INPUT] -------------------------------
 # At the test, you can ask the judge to set the speed to anything. 
@@ -57,7 +61,6 @@ os.makedirs(output_folder, exist_ok=True)
 
 filename = f'{output_folder}/windspeed_{windspeed_str}_rload_{r_load_str}_{timestamp}.csv'
 
-voltages, currents, powers, rpms, pitches, load_settings, resistances_measured = [], [], [], [], [], [], []
 voltage = 0
 current = 0
 power = 0
@@ -70,32 +73,48 @@ reset_arduino(ser)
 print(f"SUCCESS : Begin testing at {windspeed} m/s. Logging into {filename}...")
 ser.reset_input_buffer()
 
+# SensorData layout, plausibility limits and CSV columns of step02_CWC_ctrl_box.ino
+# (see hswet_logger/schemas.py). Frames outside the limits are treated as misaligned.
+schema = get_schema('cwc')
+decoder = schema.decoder(on_text=lambda line: print(f"ARDUINO : {line}"))
+
+# Rows are appended to the CSV (and a float32 .bin copy) every CHUNK_ROWS frames,
+# so a crash loses at most one chunk. Files are fsync'ed every FSYNC_INTERVAL seconds.
+CHUNK_ROWS = 20
+FSYNC_INTERVAL = 5.0
+# SensorData has no time field: every read is stamped with time.perf_counter_ns() and
+# FrameClock fits the frames to the sketch's 250 ms dataLoggingInterval. The fitted time
+# goes in the last column (ms resolution), so the real sample rate and gaps can be measured.
+clock = FrameClock(nominal_s=0.25)
+writer = ChunkedWriter(filename, schema.header + ', Host Time (s)',
+                       chunk_rows=CHUNK_ROWS, fsync_interval=FSYNC_INTERVAL, fmt=['%.2f'] * 8 + ['%.3f'],
+                       binary_path=filename[:-len('.csv')] + '.bin',
+                       meta={'windspeed': windspeed, 'schema': 'cwc', 'rload': r_load_str, 'started': timestamp})
+
 try:
-    while True:
-        # Read the size of the struct from Arduino
-        struct_format = 'fffffff'
-        size = struct.calcsize(struct_format)
-        data = ser.read(size)
-
-        if len(data) == size:
-            # Unpack the received data into a tuple
-            unpacked_data = struct.unpack(struct_format, data)
-            voltage, current, power, rpm, pitch, load_setting, r_measured = unpacked_data
-
-            # Check for end signal (all -1)
-            if all(val == -1 for val in unpacked_data):
-                print("INFO : End signal received from Arduino. Ending data logging.")
-                break
-
-            voltages.append(voltage)
-            currents.append(current)
-            powers.append(power)
-            rpms.append(rpm)
-            pitches.append(pitch)
-            load_settings.append(load_setting)
-            resistances_measured.append(r_measured)
-
-            # Printout
+    end_received = False
+    while not end_received:
+        # Read everything the port has buffered in one call (or wait for one struct's worth)
+        data = ser.read(ser.in_waiting or decoder.size)
+        receive_ns = time.perf_counter_ns()
+
+        # The decoder splits out text lines, re-aligns on frame boundaries and
+        # returns all the complete frames at once as a structured array
+        frames = decoder.feed_array(data)
+
+        # Check for end signal (all -1)
+        end = schema.end_index(frames)
+        if end is not None:
+            print("INFO : End signal received from Arduino. Ending data logging.")
+            frames = frames[:end]
+            end_received = True
+
+        if len(frames):
+            host_time, _ = clock.stamp(len(frames), receive_ns)
+            writer.write(np.column_stack((schema.rows(frames, windspeed), host_time)))
+
+            # Printout of the latest frame
+            voltage, current, power, rpm, pitch, load_setting, r_measured = frames[-1].tolist()
             print(f"Voltage (V): {voltage:6.2f} , Current (A): {current:6.2f} , Power (W): {power:6.2f} , "
                   f"RPM: {rpm:6.0f} , Pitch: {pitch:6.0f} , Load setting: {load_setting:6.0f}, R Measured: {r_measured:6.2f}")
 
@@ -104,19 +123,11 @@ except KeyboardInterrupt:
     print("\nWARNING : KeyboardInterrupt received. Finalizing and saving data...")
 # ---------------------------------------------------------------
 finally:
-    voltages = np.array(voltages)
-    currents = np.array(currents)
-    powers = np.array(powers)
-    rpms = np.array(rpms)
-    pitches = np.array(pitches)
-    load_settings = np.array(load_settings)
-    r_measured = np.array(resistances_measured)
-    windspeeds = np.full(len(voltages), windspeed)
-
-    combined_array = np.column_stack((windspeeds, pitches, voltages, currents, powers, rpms, load_settings, r_measured))
-    combined_array = combined_array[:-1]  # Optional: drop final entry if needed
-
-    np.savetxt(filename, combined_array, delimiter=',', 
-               header='Windspeed (m/s), Pitch, Voltage (V), Current (A), Power (W), RPM, R Load (Ohms), Resistance (ohm)',
-               comments='', fmt='%.2f')
-    print(f"SUCCESS : {filename} is saved for windspeed = {windspeed} m/s")
+    writer.close()
+    print(f"SUCCESS : {filename} is saved for windspeed = {windspeed} m/s ({writer.rows_written} rows)")
+    stats = decoder.stats()
+    print(f"INFO : {stats['frames']} frames, {stats['resyncs']} resyncs, "
+          f"{stats['dropped_bytes']} bytes dropped, {stats['text_lines']} text lines")
+    timing = clock.stats()
+    print(f"INFO : sample interval {timing['interval_s'] * 1000:.2f} ms ({timing['rate_hz']:.3f} Hz), "
+          f"jitter {timing['jitter_s'] * 1000:.1f} ms, {timing['missing_frames']} frames missing")
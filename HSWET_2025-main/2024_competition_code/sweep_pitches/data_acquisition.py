@@ -1,11 +1,13 @@
 import serial
-import numpy as np 
-import struct
 import datetime
 import time
 import os
 import sys
 
+# Shared logger code lives in HSWET_2025-main/hswet_logger
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from hswet_logger import ChunkedWriter, get_schema
+
 # Open serial connection
 ser = serial.Serial('COM10', 115200, timeout = 0.1)  # Adjust 'COMx' based on your Arduino's serial port
 
@@ -30,11 +32,6 @@ current_datetime = datetime.datetime.now()
 timestamp = current_datetime.strftime("%Y-%m-%d_%H-%M-%S")
 filename = f"data_{str(windspeed)}ms_{timestamp}.csv"
 
-voltages = []
-currents = []
-rpms = []
-pitches = []
-load_settings = []
 
 voltage = 0
 current = 0
@@ -42,50 +39,50 @@ rpm = 0
 pitch = 0
 load_setting = 0
 
+# FA24 frame layout and plausibility limits, in this script's CSV columns (see
+# hswet_logger/schemas.py). Frames outside the limits are treated as misaligned.
+schema = get_schema('fa24_acq')
+decoder = schema.decoder(on_text=print)
+
+# Rows go to disk every 20 frames instead of all at the end
+writer = ChunkedWriter(filename, schema.header, chunk_rows=20, fmt='%.18e')
+
 reset_arduino(ser)
 ser.reset_input_buffer()
 try: 
     while (voltage >= 0 or current >= 0 or rpm >= 0 or pitch >= 0 or load_setting >= 0):
-        # Read the size of the struct from Arduino
-        struct_format = 'fffff'
-        size = struct.calcsize(struct_format)
-        data = ser.read(size)
-
-        if len(data) == size:
-            # Unpack the received data into a tuple
-            unpacked_data = struct.unpack(struct_format, data)
-            voltage, current, rpm, pitch, load_setting = unpacked_data
-            voltages.append(voltage)
-            currents.append(current)
-            rpms.append(rpm)
-            pitches.append(pitch)
-            load_settings.append(load_setting)
-            voltage_str = "{:>10.3f}".format(voltage)
-            current_str = "{:>10.3f}".format(current)
-            rpm_str = "{:>10.0f}".format(rpm)
-            pitch_str = "{:>10.0f}".format(pitch)
-            load_setting_str = "{:>10.0f}".format(load_setting)
-            print("Voltage: " + voltage_str, end="")
-            print(", Current: " + current_str, end="")
-            print(", RPMs: " + rpm_str, end="")
-            print(", Pitch: " + pitch_str, end="")
-            print(", Load setting: " + load_setting_str)
+        # Read everything the port has buffered in one call (or wait for one struct's worth)
+        data = ser.read(ser.in_waiting or decoder.size)
+
+        # The decoder splits out text lines, re-aligns on frame boundaries and
+        # returns all the complete frames at once as a structured array
+        frames = decoder.feed_array(data)
+        if len(frames) == 0:
+            continue
+        # All fields negative is the end signal; keep it like before and stop there
+        finished = schema.end_index(frames)
+        if finished is not None:
+            frames = frames[:finished + 1]
+        writer.write(schema.rows(frames, windspeed))
+
+        voltage, current, rpm, pitch, load_setting = frames[-1].tolist()
+        voltage_str = "{:>10.3f}".format(voltage)
+        current_str = "{:>10.3f}".format(current)
+        rpm_str = "{:>10.0f}".format(rpm)
+        pitch_str = "{:>10.0f}".format(pitch)
+        load_setting_str = "{:>10.0f}".format(load_setting)
+        print("Voltage: " + voltage_str, end="")
+        print(", Current: " + current_str, end="")
+        print(", RPMs: " + rpm_str, end="")
+        print(", Pitch: " + pitch_str, end="")
+        print(", Load setting: " + load_setting_str)
     raise KeyboardInterrupt
 
 
 
 except KeyboardInterrupt:
-    voltages = np.float64(voltages)
-    currents = np.float64(currents)
-    rpms = np.array(rpms)
-    pitches = np.array(pitches)
-    load_settings = np.array(load_settings)
-    windspeeds = [windspeed] * len(voltages)
-    resistances = voltages / currents
-    powers = voltages * currents
-    combined_array = np.column_stack((windspeeds, voltages, currents, resistances, powers, rpms, pitches, load_settings))
-    # Save the combined array to a CSV file
-    np.savetxt(filename, combined_array, delimiter=',', header='Windspeeds, Voltages, Currents, Resistances, Powers, RPMs, Pitches, Load settings', comments='')
+    writer.close()
+    print(f"Decoder: {decoder.stats()}")
 
     try:
         sys.exit(130)
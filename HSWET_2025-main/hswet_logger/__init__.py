@@ -0,0 +1,17 @@
+"""
+Shared host-side code for the turbine serial loggers.
+
+The logger scripts (step02_log_pwr_curve_data.py, step04_python_data_logging.py,
+data_acquisition.py, ...) add the HSWET_2025-main folder to sys.path and import from here.
+For new runs use the unified logger instead of copying a script:
+
+    cd HSWET_2025-main && python -m hswet_logger --windspeed 10 --port COM6
+
+(see cli.py; frame layouts are registered in schemas.py).
+"""
+from .frames import FrameDecoder, end_signal_index, is_end_signal, plausible_frame
+from .binlog import binlog_to_csv, csv_to_binlog, open_binlog
+from .writer import ChunkedWriter, read_binary
+from .reader import FrameRing, SerialReader
+from .schemas import SCHEMAS, FrameSchema, detect_schema, get_schema, register_schema
+from .timing import FrameClock
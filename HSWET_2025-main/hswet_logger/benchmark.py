@@ -0,0 +1,290 @@
+"""
+Throughput and latency benchmark for the logging path.
+
+    python -m hswet_logger.benchmark                       # default sweep, writes benchmark_results.json
+    python -m hswet_logger.benchmark --rates 1000 50000 --schemas cwc --seconds 3
+    python -m hswet_logger.benchmark --compare old_results.json
+
+Runs the same code path as python -m hswet_logger (SerialReader thread -> FrameRing ->
+drain at the status rate -> ChunkedWriter to CSV and .bin) against FakeSerial, an
+in-process port that produces frames at a fixed rate as if the Arduino were writing them.
+Each frame carries its sequence number (in the rpm and voltage fields), so for every
+schema and rate we get:
+  - fps: frames written to disk per second of emitting,
+  - dropped: frames emitted but never written (ring overflow or decoder losses),
+  - misaligned: frames the decoder accepted that carry no valid sequence number (out of
+    the emitted range, not an integer, or not after the last good one: bytes of several
+    frames decoded as one when bytes are dropped). They are written like any other frame
+    but left out of the latencies,
+  - resyncs: times the decoder lost frame alignment,
+  - p50/p99/max latency: from the frame's emit time to its chunk being written to the file,
+  - peak_rss_mb: peak resident memory while logging that point. Each point runs in a fresh
+    process (run_isolated), since the OS only reports a process's all-time peak.
+Results go to JSON with the git commit, so runs from different versions can be compared.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .reader import SerialReader
+from .schemas import get_schema
+from .writer import ChunkedWriter
+
+DEFAULT_RATES = [100, 1000, 5000, 20000, 50000, 100000]
+DEFAULT_SCHEMAS = ['fa24', 'sp25', 'cwc']
+
+# Sequence numbers are split over two fields that every schema has and whose limits allow it
+SEQ_BASE = 10000
+
+
+class FakeSerial:
+    """
+    Stands in for serial.Serial: frames become readable at rate per second from the first
+    read on, like bytes arriving in the OS buffer. read() blocks up to timeout when empty.
+    """
+
+    def __init__(self, schema, rate, drop_prob=0.0, timeout=0.1, seed=0):
+        self.schema = schema
+        self.rate = rate
+        self.drop_prob = drop_prob
+        self.timeout = timeout
+        self.rng = np.random.default_rng(seed)
+        self.dtype = schema.decoder().dtype
+        self.t0 = None
+        self.emitted = 0
+        self.buffer = bytearray()
+        self.running = True
+
+    def emit_times(self, seq):
+        return self.t0 + seq / self.rate
+
+    def _fill(self):
+        now = time.perf_counter()
+        if self.t0 is None:
+            self.t0 = now
+        due = int((now - self.t0) * self.rate) + 1 if self.running else self.emitted
+        if due <= self.emitted:
+            return
+        seq = np.arange(self.emitted, due)
+        frames = np.zeros(len(seq), dtype=self.dtype)
+        for name in self.dtype.names:
+            frames[name] = 1.0
+        frames['pitch'] = 1200.0
+        frames['rpm'] = seq % SEQ_BASE
+        frames['voltage'] = seq // SEQ_BASE
+        data = frames.tobytes()
+        if self.drop_prob > 0:
+            keep = self.rng.random(len(data)) >= self.drop_prob
+            data = np.frombuffer(data, dtype=np.uint8)[keep].tobytes()
+        self.buffer += data
+        self.emitted = due
+
+    @property
+    def in_waiting(self):
+        self._fill()
+        return len(self.buffer)
+
+    def read(self, size):
+        self._fill()
+        deadline = time.perf_counter() + self.timeout
+        while len(self.buffer) < size and time.perf_counter() < deadline:
+            time.sleep(min(0.001, 1 / self.rate))
+            self._fill()
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+def check_sequence(frames, emitted, last_good):
+    """
+    Sequence numbers of decoded frames and which of them are good: whole numbers in
+    [0, emitted) that come after last_good and after every good one before them.
+    Returns (seq, good, last_good) with the new last good sequence number.
+    """
+    rpm = frames['rpm'].astype(np.float64)
+    voltage = frames['voltage'].astype(np.float64)
+    whole = (rpm == np.floor(rpm)) & (voltage == np.floor(voltage)) & (rpm >= 0) & (rpm < SEQ_BASE) & (voltage >= 0)
+    seq = np.where(whole, voltage * SEQ_BASE + rpm, -1).astype(np.int64)
+    in_range = whole & (seq < emitted)
+    # Highest in-range number before each frame (in-range frames that are not good are never
+    # above it, so they do not change it)
+    before = np.maximum.accumulate(np.concatenate(([last_good], np.where(in_range, seq, -1)[:-1])))
+    good = in_range & (seq > before)
+    if good.any():
+        last_good = int(seq[good][-1])
+    return seq, good, last_good
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_point(schema_name, rate, seconds=2.0, status_hz=5.0, capacity=4096, chunk_rows=20,
+              drop_prob=0.0, folder=None):
+    """
+    Log one schema at one frame rate for seconds; returns the result dict. Its peak_rss_mb
+    is the peak of the calling process, so use run_isolated() to compare points.
+    """
+    schema = get_schema(schema_name)
+    ser = FakeSerial(schema, rate, drop_prob=drop_prob)
+    decoder = schema.decoder()
+    folder = folder or tempfile.mkdtemp(prefix='hswet_bench_')
+    filename = os.path.join(folder, f"bench_{schema_name}_{rate}.csv")
+    writer = ChunkedWriter(filename, schema.header, chunk_rows=chunk_rows,
+                           binary_path=filename[:-len('.csv')] + '.bin')
+    reader = SerialReader(ser, decoder, capacity=capacity)
+
+    pending = []      # emit times of frames handed to the writer but not yet in the file (NaN: misaligned)
+    latencies = []
+    seen = 0
+    misaligned = 0
+    last_good = -1
+
+    def consume(frames):
+        nonlocal seen, misaligned, last_good
+        if len(frames) == 0:
+            return
+        seq, good, last_good = check_sequence(frames, ser.emitted, last_good)
+        seen += int(good.sum())
+        misaligned += int(len(frames) - good.sum())
+        before = writer.rows_written
+        pending.append(np.where(good, ser.emit_times(seq), np.nan))
+        writer.write(schema.rows(frames, 10.0))
+        flushed = writer.rows_written - before
+        if flushed:
+            now = time.perf_counter()
+            waiting = np.concatenate(pending)
+            latencies.append(now - waiting[:flushed])
+            pending[:] = [waiting[flushed:]]
+
+    reader.start()
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        time.sleep(1 / status_hz)
+        consume(reader.drain())
+    ser.running = False          # the "Arduino" stops; let the reader catch up
+    emit_seconds = ser.emitted / rate
+    time.sleep(2 * ser.timeout)
+    reader.stop()
+    consume(reader.drain())
+    before = writer.rows_written
+    writer.close()
+    if pending and writer.rows_written > before:
+        waiting = np.concatenate(pending)
+        latencies.append(time.perf_counter() - waiting)
+    elapsed = time.perf_counter() - start
+
+    latency = np.concatenate(latencies) if latencies else np.zeros(0)
+    latency = latency[np.isfinite(latency)]
+    stats = decoder.stats()
+    return {
+        'schema': schema_name,
+        'struct_format': schema.struct_format,
+        'rate': rate,
+        'seconds': round(elapsed, 3),
+        'emitted': int(ser.emitted),
+        'written': int(writer.rows_written),
+        'fps': round(writer.rows_written / emit_seconds, 1),
+        'dropped': int(ser.emitted - seen),
+        'misaligned': misaligned,
+        'ring_overflowed': int(reader.ring.overflowed),
+        'resyncs': stats['resyncs'],
+        'dropped_bytes': stats['dropped_bytes'],
+        'latency_p50_ms': round(float(np.percentile(latency, 50)) * 1000, 2) if len(latency) else None,
+        'latency_p99_ms': round(float(np.percentile(latency, 99)) * 1000, 2) if len(latency) else None,
+        'latency_max_ms': round(float(latency.max()) * 1000, 2) if len(latency) else None,
+        'peak_rss_mb': round(peak_rss_mb(), 1) if peak_rss_mb() is not None else None,
+    }
+
+
+def run_isolated(schema_name, rate, **kwargs):
+    """run_point() in a new process, so peak_rss_mb is the peak of this point alone."""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_point, schema_name, rate, **kwargs).result()
+
+
+def git_version():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old_path):
+    """Print the fps and p99 latency change against an earlier results file."""
+    with open(old_path) as f:
+        old = {(r['schema'], r['rate']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {old_path}:")
+    for r in results:
+        prev = old.get((r['schema'], r['rate']))
+        if prev is None:
+            continue
+        print(f"  {r['schema']:6s} {r['rate']:>7d}/s  fps {prev['fps']:>9.1f} -> {r['fps']:>9.1f}   "
+              f"p99 {prev['latency_p99_ms']} -> {r['latency_p99_ms']} ms   "
+              f"dropped {prev['dropped']} -> {r['dropped']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.benchmark',
+                                     description="Benchmark logger throughput and latency.")
+    parser.add_argument('--rates', type=int, nargs='+', default=DEFAULT_RATES, help="frames per second to try")
+    parser.add_argument('--schemas', nargs='+', default=DEFAULT_SCHEMAS)
+    parser.add_argument('--seconds', type=float, default=2.0, help="duration of each point")
+    parser.add_argument('--status-hz', type=float, default=5.0)
+    parser.add_argument('--capacity', type=int, default=4096, help="ring buffer size in frames")
+    parser.add_argument('--chunk-rows', type=int, default=20)
+    parser.add_argument('--drop-prob', type=float, default=0.0, help="probability of dropping each byte")
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--compare', default=None, help="earlier results JSON to compare with")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='hswet_bench_') as folder:
+        for schema_name in args.schemas:
+            for rate in args.rates:
+                result = run_isolated(schema_name, rate, seconds=args.seconds, status_hz=args.status_hz,
+                                      capacity=args.capacity, chunk_rows=args.chunk_rows,
+                                      drop_prob=args.drop_prob, folder=folder)
+                results.append(result)
+                print(f"{schema_name:6s} {rate:>7d}/s -> {result['fps']:>9.1f} fps, dropped {result['dropped']:>6d}, "
+                      f"misaligned {result['misaligned']:>4d}, resyncs {result['resyncs']:>4d}, p50 {result['latency_p50_ms']} ms, "
+                      f"p99 {result['latency_p99_ms']} ms, rss {result['peak_rss_mb']} MB")
+
+    report = {
+        'version': git_version(),
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'settings': {'seconds': args.seconds, 'status_hz': args.status_hz, 'capacity': args.capacity,
+                     'chunk_rows': args.chunk_rows, 'drop_prob': args.drop_prob},
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"SUCCESS : results saved to {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Binary run logs (.bin): full float32 precision, opened with np.memmap instead of parsing.
+
+The CSVs round everything to %.2f (10 mA of current) and every analysis script re-parses
+them with pd.read_csv. A .bin file holds the same rows without either problem:
+
+    b'HSWB' | uint16 version | uint16 header length | JSON metadata (space padded)
+    then one row per frame: little-endian float32, one value per CSV column
+
+The JSON holds the CSV header line ("csv_header"), the structured field names ("fields")
+and whatever the logger knows about the run: wind speed, frame schema, RPM margins, start
+time. The header length is padded to a multiple of 8 so the rows stay aligned.
+
+    meta, rows = open_binlog('windspeed_10_00_..._.bin')
+    rows['rpm'], rows['power'], meta['windspeed']
+
+Convert with python -m hswet_logger.convert to-csv RUN.bin / from-csv RUN.csv.
+"""
+import json
+import os
+import re
+import struct
+
+import numpy as np
+
+from .csvlog import canonical_columns, read_csv_table
+
+MAGIC = b'HSWB'
+VERSION = 1
+_PREFIX = struct.Struct('<4sHH')
+
+
+def field_names(csv_header):
+    """
+    Structured field names for the columns of a CSV header: the canonical names from
+    csvlog where known ('voltage', 'rpm', ...), otherwise a lower_case version of the text.
+    Repeated names get a _2, _3, ... suffix.
+    """
+    names = []
+    for col, name in zip(csv_header.split(','), canonical_columns(csv_header)):
+        if name is None:
+            name = re.sub(r'[^0-9a-z]+', '_', col.strip().lower()).strip('_') or 'column'
+        base, k = name, 2
+        while name in names:
+            name = f"{base}_{k}"
+            k += 1
+        names.append(name)
+    return names
+
+
+def make_header(csv_header, **meta):
+    """The bytes that start a .bin file for rows with this CSV header."""
+    meta = dict(meta, csv_header=csv_header, fields=field_names(csv_header))
+    text = json.dumps(meta).encode('utf-8')
+    length = _PREFIX.size + len(text)
+    text += b' ' * (-length % 8)
+    return _PREFIX.pack(MAGIC, VERSION, _PREFIX.size + len(text)) + text
+
+
+def read_header(path):
+    """(metadata dict, byte offset of the first row), or (None, 0) for a headerless file."""
+    with open(path, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size or prefix[:4] != MAGIC:
+            return None, 0
+        magic, version, length = _PREFIX.unpack(prefix)
+        if version > VERSION:
+            raise ValueError(f"{path}: binary log version {version} is newer than this reader ({VERSION})")
+        meta = json.loads(f.read(length - _PREFIX.size).decode('utf-8'))
+    return meta, length
+
+
+def open_binlog(path, mode='r'):
+    """
+    Open a .bin run log as (metadata, structured array of rows) without reading it: the
+    array is a np.memmap, so pages are only loaded when touched. A row cut short by a
+    crash is ignored.
+    """
+    meta, offset = read_header(path)
+    if meta is None:
+        raise ValueError(f"{path} is not an HSWB binary log")
+    dtype = np.dtype([(name, '<f4') for name in meta['fields']])
+    rows = (os.path.getsize(path) - offset) // dtype.itemsize
+    if rows == 0:
+        return meta, np.zeros(0, dtype=dtype)
+    return meta, np.memmap(path, dtype=dtype, mode=mode, offset=offset, shape=(rows,))
+
+
+def as_table(rows):
+    """A structured float32 row array as a plain (rows, columns) float32 view."""
+    return rows.view('<f4').reshape(len(rows), len(rows.dtype.names))
+
+
+def _check_target(path, overwrite):
+    if os.path.exists(path) and not overwrite:
+        raise FileExistsError(f"{path} already exists (pass overwrite=True / --force to replace it)")
+
+
+def binlog_to_csv(path, csv_path=None, fmt='%.2f', overwrite=False):
+    """Write the CSV the logger would have written for this .bin file; returns its path."""
+    meta, rows = open_binlog(path)
+    csv_path = csv_path or os.path.splitext(path)[0] + '.csv'
+    _check_target(csv_path, overwrite)
+    np.savetxt(csv_path, as_table(rows), delimiter=',', header=meta['csv_header'], comments='', fmt=fmt)
+    return csv_path
+
+
+def csv_to_binlog(csv_path, path=None, overwrite=False, **meta):
+    """
+    Convert a logged CSV (any header dialect) to a .bin file with the same columns; returns
+    its path. The wind speed is taken from the data when not given.
+    """
+    path = path or os.path.splitext(csv_path)[0] + '.bin'
+    _check_target(path, overwrite)
+    csv_header, data = read_csv_table(csv_path)
+    names = canonical_columns(csv_header)
+    if 'windspeed' not in meta and 'windspeed' in names and len(data):
+        meta['windspeed'] = float(data[0, names.index('windspeed')])
+    with open(path, 'wb') as f:
+        f.write(make_header(csv_header, source=os.path.basename(csv_path), **meta))
+        # Garbage from misaligned frames in old runs can exceed float32; it becomes inf
+        with np.errstate(over='ignore'):
+            data.astype('<f4').tofile(f)
+    return path
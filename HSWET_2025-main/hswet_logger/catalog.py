@@ -0,0 +1,263 @@
+"""
+An SQLite index of every logged run, so questions like "all 10 m/s runs with loads below
+15 ohm" do not mean opening every CSV.
+
+    python -m hswet_logger.catalog build              # scan every data_logged folder (incremental)
+    python -m hswet_logger.catalog query "windspeed = 10 AND rload_max < 15"
+
+    from hswet_logger.catalog import build_catalog, query_runs
+    build_catalog()
+    runs = query_runs("windspeed = ? AND rload_max < ?", (10, 15))
+
+Run metadata is only in the file names, and the naming changed every season:
+    data_8ms_2024-12-12_08-12-47.csv                              (FA24 archive)
+    windspeed_9ms_2024-12-12_09-58-05.csv
+    windspeed_13_50m_per_s_2024-12-12_12-22-01.csv
+    windspeed_10_00_m_per_s_rload_25_60_2025-03-06_16-50-39.csv   (rload 25.60 ohm)
+    windspeed_12_00_rload_10_0_2025-04-11_14-18-34_no_encoder.csv (trailing note)
+    windspeed_07_00_rload_10-45_2025-05-12_11-50-10.csv           (sweep from 10 to 45 ohm)
+    ws_10_00_rload_10_00_margins_1500_800_2025-05-20_10-00-00.csv (step04 / unified logger)
+    Blade_A_Windspeed_9_00_04-02-2025.csv                         (data_analysis/Test_data, date only)
+parse_run_name() reads all of them; the loggers wrote the fractional part of wind speed
+and load in hundredths. Each run also gets summary statistics from its data (rows, max
+power, RPM and pitch range). A file is only re-read when its mtime or size changed.
+"""
+import argparse
+import datetime
+import glob
+import os
+import re
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+from .csvlog import read_run_csv
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB = os.path.join(REPO_ROOT, 'run_catalog.sqlite')
+
+_NAME = re.compile(
+    r'^(?P<prefix>data|windspeed|ws)_(?P<ws>\d+(?:_\d+)?)(?:_?m_per_s|ms)?'
+    r'(?:_rload_(?P<rload>\d+(?:[-_]\d+)?|[A-Za-z]+))?'
+    r'(?:_margins_(?P<rpm_high>\d+)_(?P<rpm_low>\d+))?'
+    r'_(?P<started>\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:_(?P<note>.+))?$')
+_TEST_DATA_NAME = re.compile(r'^(?P<note>.+)_Windspeed_(?P<ws>\d+_\d+)_(?P<date>\d{2}-\d{2}-\d{4})$')
+
+COLUMNS = [
+    ('path', 'TEXT PRIMARY KEY'),     # relative to HSWET_2025-main, with forward slashes
+    ('session', 'TEXT'),              # folder under data_logged, e.g. FA24/12-13-2024_Morning_Session
+    ('name_format', 'TEXT'),          # data / windspeed / windspeed_m_per_s / ws / test_data
+    ('windspeed', 'REAL'),
+    ('rload', 'TEXT'),                # as written in the name: 10_0, 4-15, sweep
+    ('rload_min', 'REAL'),
+    ('rload_max', 'REAL'),
+    ('rpm_high', 'INTEGER'),
+    ('rpm_low', 'INTEGER'),
+    ('started', 'TEXT'),              # ISO date and time the run started
+    ('note', 'TEXT'),
+    ('header', 'TEXT'),
+    ('rows', 'INTEGER'),
+    ('max_power', 'REAL'),
+    ('mean_power', 'REAL'),
+    ('rpm_min', 'REAL'),
+    ('rpm_max', 'REAL'),
+    ('pitch_min', 'REAL'),
+    ('pitch_max', 'REAL'),
+    ('has_bin', 'INTEGER'),
+    ('mtime', 'REAL'),
+    ('size', 'INTEGER'),
+]
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+
+def _hundredths(text):
+    """'10_50' -> 10.5, '25_6' -> 25.06, '8' -> 8.0 (the loggers' {int}_{hundredths} format)."""
+    whole, _, frac = text.partition('_')
+    return int(whole) + (int(frac) / 100 if frac else 0.0)
+
+
+def parse_run_name(filename):
+    """
+    Metadata dict from a run file name (see the module docstring), or None if the name
+    follows none of the known patterns.
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    match = _NAME.match(stem)
+    if match is None:
+        match = _TEST_DATA_NAME.match(stem)
+        if match is None:
+            return None
+        started = datetime.datetime.strptime(match['date'], "%m-%d-%Y")
+        return dict(dict.fromkeys(['rload', 'rload_min', 'rload_max', 'rpm_high', 'rpm_low']),
+                    name_format='test_data', windspeed=_hundredths(match['ws']),
+                    started=started.isoformat(sep=' '), note=match['note'])
+    ws, rload = match['ws'], match['rload']
+    name_format = match['prefix']
+    if 'm_per_s' in stem:
+        name_format += '_m_per_s'
+    rload_min = rload_max = None
+    if rload and '-' in rload:
+        rload_min, rload_max = (float(part) for part in rload.split('-'))
+    elif rload and rload[0].isdigit():
+        rload_min = rload_max = _hundredths(rload)
+    started = datetime.datetime.strptime(match['started'], "%Y-%m-%d_%H-%M-%S")
+    return {
+        'name_format': name_format,
+        'windspeed': _hundredths(ws),
+        'rload': rload,
+        'rload_min': rload_min,
+        'rload_max': rload_max,
+        'rpm_high': int(match['rpm_high']) if match['rpm_high'] else None,
+        'rpm_low': int(match['rpm_low']) if match['rpm_low'] else None,
+        'started': started.isoformat(sep=' '),
+        'note': match['note'],
+    }
+
+
+def _finite_stat(func, values):
+    values = values[np.isfinite(values)] if values is not None else None
+    return float(func(values)) if values is not None and len(values) else None
+
+
+def run_stats(path):
+    """Row count and summary statistics of one logged CSV."""
+    with open(path) as f:
+        header = f.readline().strip()
+    columns = read_run_csv(path)
+    rows = len(next(iter(columns.values()))) if columns else 0
+    power, rpm, pitch = columns.get('power'), columns.get('rpm'), columns.get('pitch')
+    return {
+        'header': header,
+        'rows': rows,
+        'max_power': _finite_stat(np.max, power),
+        'mean_power': _finite_stat(np.mean, power),
+        'rpm_min': _finite_stat(np.min, rpm),
+        'rpm_max': _finite_stat(np.max, rpm),
+        'pitch_min': _finite_stat(np.min, pitch),
+        'pitch_max': _finite_stat(np.max, pitch),
+    }
+
+
+def find_run_files(roots=None):
+    """Every CSV under a data_logged folder of the repo (or under the given roots)."""
+    if roots is None:
+        roots = sorted(glob.glob(os.path.join(REPO_ROOT, '**', 'data_logged'), recursive=True))
+    paths = []
+    for root in roots:
+        paths += glob.glob(os.path.join(root, '**', '*.csv'), recursive=True)
+    return sorted(paths)
+
+
+def _session(path):
+    """Folder of the run below its data_logged folder ('' if it sits directly in it)."""
+    parts = path.replace(os.sep, '/').split('/')
+    if 'data_logged' not in parts:
+        return os.path.basename(os.path.dirname(path))
+    return '/'.join(parts[len(parts) - parts[::-1].index('data_logged'):-1])
+
+
+def open_catalog(db_path=DEFAULT_DB):
+    """Connection to the catalog, creating the table and indexes if needed. Rows behave like dicts."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"CREATE TABLE IF NOT EXISTS runs ({', '.join(f'{n} {t}' for n, t in COLUMNS)})")
+    for name in ('windspeed', 'rload_min', 'rload_max', 'started', 'session'):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS runs_{name} ON runs ({name})")
+    return conn
+
+
+def build_catalog(db_path=DEFAULT_DB, roots=None, verbose=False):
+    """
+    Bring the catalog up to date with the files on disk: new and changed files (by mtime
+    and size) are read, deleted ones are dropped. Returns counts of what happened.
+    """
+    counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0, 'unparsed': 0}
+    conn = open_catalog(db_path)
+    known = {row['path']: (row['mtime'], row['size']) for row in conn.execute("SELECT path, mtime, size FROM runs")}
+    seen = set()
+    records = []
+    for full_path in find_run_files(roots):
+        path = os.path.relpath(full_path, REPO_ROOT).replace(os.sep, '/')
+        seen.add(path)
+        st = os.stat(full_path)
+        if known.get(path) == (st.st_mtime, st.st_size):
+            counts['unchanged'] += 1
+            continue
+        meta = parse_run_name(full_path)
+        if meta is None:
+            counts['unparsed'] += 1
+            meta = {}
+            if verbose:
+                print(f"WARNING : unknown file name pattern {path}")
+        record = dict.fromkeys(COLUMN_NAMES)
+        record.update(meta)
+        try:
+            record.update(run_stats(full_path))
+        except (OSError, ValueError) as err:
+            print(f"WARNING : could not read {path}: {err}")
+        record.update(path=path, session=_session(path), mtime=st.st_mtime, size=st.st_size,
+                      has_bin=int(os.path.exists(full_path[:-len('.csv')] + '.bin')))
+        records.append(record)
+        counts['updated' if path in known else 'added'] += 1
+
+    removed = [(path,) for path in known if path not in seen]
+    counts['removed'] = len(removed)
+    with conn:
+        conn.executemany(f"INSERT OR REPLACE INTO runs ({', '.join(COLUMN_NAMES)}) "
+                         f"VALUES ({', '.join('?' * len(COLUMN_NAMES))})",
+                         [tuple(record[name] for name in COLUMN_NAMES) for record in records])
+        conn.executemany("DELETE FROM runs WHERE path = ?", removed)
+    conn.close()
+    return counts
+
+
+def query_runs(where='1', params=(), db_path=DEFAULT_DB, order_by='started'):
+    """
+    Runs matching an SQL condition on the columns in COLUMNS, as a list of dicts, e.g.
+    query_runs("windspeed = ? AND rload_max < ?", (10, 15)).
+    """
+    conn = open_catalog(db_path)
+    try:
+        rows = conn.execute(f"SELECT * FROM runs WHERE {where} ORDER BY {order_by}", params).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+
+def run_path(run):
+    """Absolute path of a run returned by query_runs()."""
+    return os.path.join(REPO_ROOT, *run['path'].split('/'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.catalog',
+                                     description="Index the logged runs and query them.")
+    parser.add_argument('command', choices=['build', 'query'])
+    parser.add_argument('where', nargs='?', default='1', help="SQL condition for query, e.g. \"windspeed = 10\"")
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--root', action='append', default=None,
+                        help="folder to scan instead of every data_logged folder; repeatable")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        counts = build_catalog(args.db, args.root, verbose=True)
+        print(f"SUCCESS : {args.db} updated in {time.perf_counter() - start:.2f} s "
+              + ", ".join(f"{n} {k}" for k, n in counts.items()))
+        return 0
+
+    start = time.perf_counter()
+    runs = query_runs(args.where, db_path=args.db)
+    elapsed = time.perf_counter() - start
+    for run in runs:
+        power = f"{run['max_power']:8.2f}" if run['max_power'] is not None else '       -'
+        print(f"{run['windspeed']:6.2f} m/s  rload {str(run['rload']):>8s}  {run['rows']:>6} rows  "
+              f"max {power} W  {run['path']}")
+    print(f"INFO : {len(runs)} runs in {elapsed * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
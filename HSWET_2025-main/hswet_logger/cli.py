@@ -0,0 +1,197 @@
+"""
+Command-line logger: one script for every season's sketch.
+
+    python -m hswet_logger --windspeed 10 --port COM6
+    python -m hswet_logger --windspeed 7.5 --schema step04 --rload 20
+    python -m hswet_logger --list-schemas
+
+Run it from the folder that should hold data_logged/ (as with the old scripts). The schema
+is detected from the stream unless --schema is given. Reading, decoding, resync, chunked
+writing and the status line all come from the rest of this package.
+"""
+import argparse
+import datetime
+import glob
+import os
+import sys
+import time
+
+from .reader import SerialReader
+from .schemas import SCHEMAS, detect_schema, get_schema, parse_margins
+from .writer import ChunkedWriter
+
+# How long to listen before guessing the schema (seconds), how much of the stream to look
+# at (bytes, about 16 frames), and how long to wait for the Arduino to start talking at all
+DETECT_SECONDS = 2.0
+DETECT_BYTES = 512
+DETECT_TIMEOUT = 30.0
+
+
+def list_serial_ports():
+    """Serial ports that look like an Arduino (Mac/Linux names first, then COM ports)."""
+    ports = glob.glob('/dev/tty.usbmodem*') + glob.glob('/dev/tty.usbserial*') + glob.glob('/dev/ttyACM*')
+    if not ports:
+        try:
+            from serial.tools import list_ports
+            ports = [p.device for p in list_ports.comports()]
+        except ImportError:
+            pass
+    return ports
+
+
+def reset_arduino(serial_port):
+    serial_port.setDTR(False)
+    time.sleep(0.1)
+    serial_port.setDTR(True)
+
+
+def run_filename(folder, schema, windspeed, rload, margins, now):
+    """File name in the pattern the analysis scripts expect for this kind of run."""
+    windspeed_str = f"{int(windspeed):02d}_{round((windspeed % 1) * 100):02d}"
+    if margins is not None:
+        return f"{folder}/ws_{windspeed_str}_rload_{rload}_margins_{margins[0]}_{margins[1]}_{now}.csv"
+    return f"{folder}/windspeed_{windspeed_str}_rload_{rload}_{now}.csv"
+
+
+def read_header(ser, schema_name, seconds=DETECT_SECONDS):
+    """
+    Listen after the reset and work out the schema. Returns (schema, margins, leftover) where
+    leftover is the raw stream after any RPM_MARGINS line, to be decoded as frames.
+    """
+    sample = bytearray()
+    start = time.monotonic()
+    while time.monotonic() - start < DETECT_TIMEOUT:
+        sample += ser.read(ser.in_waiting or 1)
+        if b'RPM_MARGINS:' in sample and sample.endswith(b'\n'):
+            break
+        if time.monotonic() - start >= seconds and (schema_name != 'auto' or len(sample) >= DETECT_BYTES):
+            break
+
+    margins = None
+    start = sample.find(b'RPM_MARGINS:')
+    if start >= 0:
+        end = sample.find(b'\n', start)
+        if end >= 0:
+            margins = parse_margins(sample[start:end].decode('ascii', errors='ignore'))
+            sample = sample[end + 1:]
+
+    if schema_name != 'auto':
+        return get_schema(schema_name), margins, bytes(sample)
+    if margins is not None:
+        return next(s for s in SCHEMAS.values() if s.margins), margins, bytes(sample)
+    if len(sample) < DETECT_BYTES:
+        raise SystemExit(f"ERROR : Only {len(sample)} bytes in {DETECT_TIMEOUT:.0f} s, cannot detect the "
+                         "frame schema. Check the port or pass --schema.")
+    schema, _ = detect_schema(sample)
+    return schema, None, bytes(sample)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger',
+                                     description="Log turbine frames from the Arduino to CSV.")
+    parser.add_argument('--windspeed', type=float, help="wind speed set by the judge (m/s)")
+    parser.add_argument('--port', help="serial port, e.g. COM6 (default: first Arduino-looking port)")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--schema', default='auto', choices=['auto'] + sorted(SCHEMAS),
+                        help="frame layout sent by the sketch (default: detect)")
+    parser.add_argument('--rload', default='sweep', help="load label used in the file name")
+    parser.add_argument('--date', default=datetime.date.today().strftime("%m-%d-%Y"),
+                        help="subfolder of data_logged/ (default: today, MM-DD-YYYY)")
+    parser.add_argument('--out', default='data_logged', help="output folder")
+    parser.add_argument('--chunk-rows', type=int, default=20, help="rows per disk write")
+    parser.add_argument('--fsync-interval', type=float, default=5.0, help="seconds between fsyncs")
+    parser.add_argument('--status-hz', type=float, default=5.0, help="status line refresh rate")
+    parser.add_argument('--no-reset', action='store_true', help="do not toggle DTR to reset the Arduino")
+    parser.add_argument('--list-schemas', action='store_true', help="print the known frame schemas and exit")
+    args = parser.parse_args(argv)
+    if not args.list_schemas and args.windspeed is None:
+        parser.error("--windspeed is required")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list_schemas:
+        for name in sorted(SCHEMAS):
+            schema = SCHEMAS[name]
+            print(f"{name:8s} {schema.struct_format:10s} {schema.description}")
+        return 0
+
+    import serial
+
+    port = args.port
+    if port is None:
+        ports = list_serial_ports()
+        if not ports:
+            raise SystemExit("ERROR : No serial ports found. Ensure your Arduino is connected.")
+        print(f"Available ports: {ports}")
+        port = ports[0]
+    ser = serial.Serial(port, args.baud, timeout=0.1)
+    if not args.no_reset:
+        reset_arduino(ser)
+
+    schema, margins, leftover = read_header(ser, args.schema)
+    print(f"INFO : Using frame schema '{schema.name}' ({schema.description})")
+    if margins is not None:
+        print(f"INFO : Got RPM_MARGIN_HIGH={margins[0]}, LOW={margins[1]}")
+
+    folder = f"{args.out}/{args.date}"
+    os.makedirs(folder, exist_ok=True)
+    now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    filename = run_filename(folder, schema, args.windspeed, args.rload, margins, now)
+    print(f"SUCCESS : Begin testing at {args.windspeed} m/s. Logging into {filename}...")
+
+    decoder = schema.decoder(on_text=lambda line: print(f"\nARDUINO : {line}"))
+    writer = ChunkedWriter(filename, schema.header, chunk_rows=args.chunk_rows,
+                           fsync_interval=args.fsync_interval,
+                           binary_path=filename[:-len('.csv')] + '.bin',
+                           meta={'windspeed': args.windspeed, 'schema': schema.name, 'rpm_margins': margins,
+                                 'rload': args.rload, 'started': now})
+    reader = SerialReader(ser, decoder)
+    reader.ring.push(decoder.feed_array(leftover), time.perf_counter())
+    reader.start()
+
+    def log(frames):
+        """Write frames up to the end signal. Returns (frames written, end signal seen)."""
+        end = schema.end_index(frames)
+        if end is not None:
+            frames = frames[:end]
+        if len(frames):
+            writer.write(schema.rows(frames, args.windspeed))
+        return frames, end is not None
+
+    finished = False
+    try:
+        while reader.running and not finished:
+            time.sleep(1 / args.status_hz)
+            frames, finished = log(reader.drain())
+            if len(frames) == 0:
+                continue
+            latest = ' '.join(f"{name}: {val:.2f}" for name, val in zip(schema.fields, frames[-1].tolist()))
+            ring = reader.stats()
+            print(f"\r{latest} | frames: {decoder.frames} overflow: {ring['overflowed']} "
+                  f"lag: {ring['latency_last'] * 1000:.0f} ms", end="", flush=True)
+        if finished:
+            print("\nINFO : End signal received from Arduino. Ending data logging.")
+        if reader.error is not None:
+            print(f"\nERROR : serial reader stopped: {reader.error!r}")
+    except KeyboardInterrupt:
+        print("\nWARNING : KeyboardInterrupt received. Finalizing and saving data...")
+    finally:
+        reader.stop()
+        if not finished:
+            log(reader.drain())
+        writer.close()
+        ser.close()
+
+    print(f"SUCCESS : {filename} is saved for windspeed = {args.windspeed} m/s ({writer.rows_written} rows)")
+    stats = decoder.stats()
+    ring = reader.stats()
+    print(f"INFO : {stats['frames']} frames, {stats['resyncs']} resyncs, "
+          f"{stats['dropped_bytes']} bytes dropped, {stats['text_lines']} text lines, "
+          f"ring overflowed {ring['overflowed']}, max lag {ring['latency_max'] * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
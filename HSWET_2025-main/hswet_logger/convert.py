@@ -0,0 +1,33 @@
+"""
+Convert between logged CSVs and .bin run logs (see binlog.py).
+
+    python -m hswet_logger.convert from-csv data_logged/05-13-2025_CWC/*.csv
+    python -m hswet_logger.convert to-csv RUN.bin
+    python -m hswet_logger.convert info RUN.bin
+"""
+import argparse
+import sys
+
+from .binlog import binlog_to_csv, csv_to_binlog, open_binlog
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.convert',
+                                     description="Convert between logged CSVs and .bin run logs.")
+    parser.add_argument('direction', choices=['to-csv', 'from-csv', 'info'])
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--force', action='store_true', help="replace output files that already exist")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        if args.direction == 'to-csv':
+            print(binlog_to_csv(path, overwrite=args.force))
+        elif args.direction == 'from-csv':
+            print(csv_to_binlog(path, overwrite=args.force))
+        else:
+            meta, rows = open_binlog(path)
+            print(f"{path}: {len(rows)} rows, {meta}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
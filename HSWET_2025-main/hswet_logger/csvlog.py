@@ -0,0 +1,74 @@
+"""
+Reading the logged CSVs whatever season wrote them.
+
+The loggers have written several header dialects over the years (see schemas.py), e.g.
+    Windspeed (m/s), Pitch, Voltage (V), Current (A), Resistance (ohm), Power (W), RPM, Load Setting
+    Windspeed (m/s), Pitch, Voltage (V), Current (A), Power (W), RPM, R Load (Ohms), Resistance (ohm)
+    Windspeeds, Voltages, Currents, Resistances, Powers, RPMs, Pitches, Load settings
+    Windspeed,Pitch,Voltage,Current,Resistance,Power,RPM,Load Setting     (data_analysis/Test_data)
+read_run_csv() maps any of them onto one set of canonical column names.
+"""
+import warnings
+
+import numpy as np
+
+# Canonical column -> header spellings used by the different loggers
+CSV_ALIASES = {
+    'windspeed': ('Windspeed (m/s)', 'Windspeeds', 'Windspeed'),
+    'pitch': ('Pitch', 'Pitches', 'chart'),
+    'timestamp': ('Time',),
+    'voltage': ('Voltage (V)', 'Voltages', 'Voltage'),
+    'current': ('Current (A)', 'Currents', 'Current'),
+    'resistance': ('Resistance (ohm)', 'Resistances', 'Resistance'),
+    'power': ('Power (W)', 'Powers', 'Power'),
+    'rpm': ('RPM', 'RPMs'),
+    'load_setting': ('Load Setting', 'R Load (Ohms)', 'Load settings'),
+    'host_time': ('Host Time (s)',),
+}
+
+_CANONICAL = {alias.lower(): name for name, aliases in CSV_ALIASES.items() for alias in aliases}
+
+
+def _parse_float(text):
+    """float() that also reads spreadsheet-style negatives such as '(29.67)'."""
+    text = text.strip()
+    if text.startswith('(') and text.endswith(')'):
+        return -float(text[1:-1])
+    return float(text)
+
+
+def canonical_columns(header):
+    """Canonical name (or None if unknown) for each column of a CSV header line."""
+    return [_CANONICAL.get(col.strip().lower()) for col in header.strip().split(',')]
+
+
+def read_csv_table(path):
+    """(header line, 2D float array of the rows) of a logged CSV."""
+    with open(path) as f:
+        header = f.readline().strip()
+    try:
+        with warnings.catch_warnings():
+            # A run stopped before its first frame has only the header
+            warnings.filterwarnings('ignore', message='loadtxt: input contained no data')
+            data = np.loadtxt(path, delimiter=',', skiprows=1, ndmin=2)
+    except ValueError:
+        # A few archived files were opened and re-saved in a spreadsheet
+        with open(path) as f:
+            next(f)
+            data = np.array([[_parse_float(val) for val in line.split(',')] for line in f if line.strip()])
+    if data.size == 0:
+        data = np.zeros((0, len(header.split(','))))
+    return header, data
+
+
+def read_run_csv(path):
+    """
+    Load a logged run as a dict of canonical column name -> float array. When a header
+    repeats a column (one old file has Pitch twice) the first one is used.
+    """
+    header, data = read_csv_table(path)
+    columns = {}
+    for k, name in enumerate(canonical_columns(header)):
+        if name is not None and name not in columns and k < data.shape[1]:
+            columns[name] = data[:, k]
+    return columns
@@ -0,0 +1,233 @@
+"""
+Self-resynchronizing decoder for the Arduino serial stream.
+
+The sketches send a packed struct of floats per sample (Serial.write(&data, sizeof(data)))
+but also print text (Serial.println("Brake tasks"), "Residual current: ...") into the same
+stream, with no framing. Reading fixed-size chunks means one stray line or dropped byte
+shifts every later frame. FrameDecoder instead:
+  - checks every candidate frame with plausibility limits on the float fields,
+  - splits printable lines ending in a newline out as text messages,
+  - otherwise drops one byte at a time until frames line up again,
+so a glitch costs at most the frame it happened in.
+
+feed_array() is the bulk path: while the stream is aligned it decodes every complete
+frame in the buffer at once with np.frombuffer into a structured array (one float32
+field per struct member), checks them with vectorized limits, and only falls back to
+the byte-wise path around text or damage. The partial tail is kept for the next read.
+"""
+import math
+import struct
+
+import numpy as np
+
+# A misaligned frame reads exponent bits out of the mantissa, so it tends to give
+# huge values or tiny (subnormal-looking) ones. Real readings are never this small.
+TINY = 1e-30
+
+# Default per-field limits when none are given: anything finite below this magnitude.
+DEFAULT_LIMIT = 1e6
+
+# Longest text line the sketches print, in bytes.
+MAX_TEXT_LEN = 200
+
+
+def is_end_signal(values):
+    """True for the all -1 frame the sketches send when the sweep is finished."""
+    return all(val == -1 for val in values)
+
+
+def end_signal_index(frames):
+    """Index of the first end-signal row in a structured frame array, or None."""
+    if len(frames) == 0:
+        return None
+    plain = frames.view(np.float32).reshape(len(frames), -1)
+    hits = np.nonzero(np.all(plain == -1, axis=1))[0]
+    return int(hits[0]) if len(hits) else None
+
+
+def plausible_frame(values, limits=None):
+    """
+    True if every value is finite, not a tiny nonzero number, and inside its (low, high)
+    limit. limits is a list with one (low, high) pair per field, or None for the defaults.
+    """
+    for k, val in enumerate(values):
+        if not math.isfinite(val):
+            return False
+        if val != 0.0 and abs(val) < TINY:
+            return False
+        low, high = limits[k] if limits else (-DEFAULT_LIMIT, DEFAULT_LIMIT)
+        if not (low <= val <= high):
+            return False
+    return True
+
+
+def _printable(byte):
+    return 32 <= byte < 127 or byte in (9, 13)
+
+
+class FrameDecoder:
+    """
+    Incremental decoder: feed() it whatever bytes were read from the port and it returns
+    the complete, plausible frames (tuples of floats) found so far. Bytes of an incomplete
+    frame are kept for the next call.
+
+    Text lines are passed to on_text(line) (if given). The counters frames, resyncs,
+    dropped_bytes and text_lines describe the stream so far; resyncs counts how many times
+    the decoder lost frame alignment and had to search for it again.
+
+    feed_array() does the same job but returns a structured array named by field_names
+    (f0, f1, ... by default); both calls share the buffer and counters.
+    """
+
+    def __init__(self, struct_format='<fffffff', limits=None, on_text=None, field_names=None):
+        self.struct = struct.Struct(struct_format)
+        self.size = self.struct.size
+        self.limits = limits
+        self.on_text = on_text
+        n_fields = len(self.struct.unpack(bytes(self.size)))
+        if field_names is None:
+            field_names = [f"f{k}" for k in range(n_fields)]
+        # Structured dtype for feed_array; the sketches only send little-endian floats.
+        self.dtype = np.dtype([(name, '<f4') for name in field_names])
+        if self.dtype.itemsize != self.size:
+            raise ValueError(f"feed_array needs a struct of float32 fields, got {struct_format!r}")
+        if limits:
+            self._low = np.array([low for low, _ in limits], dtype=np.float32)
+            self._high = np.array([high for _, high in limits], dtype=np.float32)
+        else:
+            self._low = np.float32(-DEFAULT_LIMIT)
+            self._high = np.float32(DEFAULT_LIMIT)
+        self.buffer = bytearray()
+        self.locked = True
+        self.frames = 0
+        self.resyncs = 0
+        self.dropped_bytes = 0
+        self.text_lines = 0
+
+    def feed(self, data):
+        """Add bytes from the port and return the list of frames decoded from them."""
+        self.buffer += data
+        frames = []
+        pos = 0
+        while len(self.buffer) - pos >= self.size:
+            values, nxt = self._step(self.buffer, pos)
+            if nxt is None:
+                break
+            if values is not None:
+                frames.append(values)
+            pos = nxt
+        del self.buffer[:pos]
+        return frames
+
+    def feed_array(self, data):
+        """
+        Bulk version of feed(): add bytes from the port and return the decoded frames as a
+        structured NumPy array (dtype self.dtype).
+        """
+        self.buffer += data
+        chunks = []
+        singles = []
+        pos = 0
+        n_fields = len(self.dtype)
+        while len(self.buffer) - pos >= self.size:
+            if self.locked:
+                n = (len(self.buffer) - pos) // self.size
+                plain = np.frombuffer(self.buffer, dtype='<f4', count=n * n_fields,
+                                      offset=pos).reshape(n, n_fields)
+                ok = self._plausible_rows(plain)
+                good = n if ok.all() else int(np.argmin(ok))
+                if good:
+                    if singles:
+                        chunks.append(np.array(singles, dtype=self.dtype))
+                        singles = []
+                    chunks.append(plain[:good].copy().view(self.dtype).ravel())
+                    self.frames += good
+                    pos += good * self.size
+                plain = None  # release the view so the buffer can be resized
+                if good:
+                    continue
+            # Byte-wise path around text, damage, or while searching for alignment.
+            values, nxt = self._step(self.buffer, pos)
+            if nxt is None:
+                break
+            if values is not None:
+                singles.append(values)
+            pos = nxt
+        if singles:
+            chunks.append(np.array(singles, dtype=self.dtype))
+        del self.buffer[:pos]
+        if not chunks:
+            return np.zeros(0, dtype=self.dtype)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+    def stats(self):
+        """Counters as a dict, for printing at the end of a run."""
+        return {'frames': self.frames, 'resyncs': self.resyncs,
+                'dropped_bytes': self.dropped_bytes, 'text_lines': self.text_lines}
+
+    def _step(self, buf, pos):
+        """
+        Decode one item at pos. Returns (frame or None, new pos), or (None, None) when the
+        bytes at pos are the start of a text line that has not fully arrived yet.
+        """
+        values = self.struct.unpack_from(buf, pos)
+        if self._accept(values, buf, pos):
+            self.frames += 1
+            self.locked = True
+            return values, pos + self.size
+
+        text_end = self._text_line_end(buf, pos)
+        if text_end == -1:
+            return None, None  # looks like the start of a line; wait for the rest of it
+        if text_end is not None:
+            line = bytes(buf[pos:text_end]).decode('ascii').strip()
+            if line:
+                self.text_lines += 1
+                if self.on_text is not None:
+                    self.on_text(line)
+            return None, text_end
+
+        # Neither a frame nor text: slide forward one byte and try again.
+        if self.locked:
+            self.resyncs += 1
+            self.locked = False
+        self.dropped_bytes += 1
+        return None, pos + 1
+
+    def _plausible_rows(self, plain):
+        """Vectorized plausible_frame / is_end_signal for an (n, fields) float32 array."""
+        with np.errstate(invalid='ignore'):
+            ok = np.isfinite(plain) & ((plain == 0) | (np.abs(plain) >= TINY))
+            ok &= (plain >= self._low) & (plain <= self._high)
+        return ok.all(axis=1) | np.all(plain == -1, axis=1)
+
+    def _accept(self, values, buf, pos):
+        if not (is_end_signal(values) or plausible_frame(values, self.limits)):
+            return False
+        if self.locked:
+            return True
+        # While searching, only re-lock when the following frame also lines up (or has not
+        # arrived yet), so one lucky-looking offset does not lock onto the wrong boundary.
+        nxt = pos + self.size
+        if len(buf) - nxt < self.size:
+            return True
+        following = self.struct.unpack_from(buf, nxt)
+        return (is_end_signal(following) or plausible_frame(following, self.limits)
+                or self._text_line_end(buf, nxt) is not None)
+
+    def _text_line_end(self, buf, pos):
+        """
+        If a printable line ending in '\\n' starts at pos, return the index just past it.
+        Returns -1 if it is still printable where the buffer ends (line not complete yet),
+        or None if this is not text.
+        """
+        end = min(len(buf), pos + MAX_TEXT_LEN)
+        for k in range(pos, end):
+            byte = buf[k]
+            if byte == 10:
+                return k + 1 if k > pos else None
+            if not _printable(byte):
+                return None
+        if end == len(buf):
+            return -1
+        return None
@@ -0,0 +1,239 @@
+"""
+One columnar cache of every logged run, whatever logger and season wrote it.
+
+    python -m hswet_logger.ingest                 # convert new and changed CSVs (in parallel)
+    python -m hswet_logger.ingest --info
+
+    from hswet_logger.ingest import load_history
+    data, runs = load_history()                   # all runs in one read
+    data['power'], data['rpm'], runs[data['run'][0]]['path']
+
+Every CSV in the repo with a known header dialect (see csvlog.py: data_acquisition.py,
+step02, step04, Test_data, ...) is mapped onto the canonical columns in CANONICAL, with NaN
+where a dialect has no such column, and stored under
+
+    run_cache/date=2025-05-12/windspeed=10.00/part.npz     one array per column + 'run'
+    run_cache/manifest.json                                 run id, source, mtime and size per run
+
+The date and wind speed come from the file name (catalog.parse_run_name), or from the file's
+mtime and data when the name has neither. Only new or changed files (by mtime and size) are
+read again, in a process pool, and only the partitions they touch are rewritten.
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .catalog import REPO_ROOT, parse_run_name
+from .csvlog import CSV_ALIASES, read_run_csv
+
+CANONICAL = tuple(CSV_ALIASES)
+DEFAULT_CACHE = os.path.join(REPO_ROOT, 'run_cache')
+MANIFEST = 'manifest.json'
+PART = 'part.npz'
+
+
+def find_sources(roots=None, cache_dir=DEFAULT_CACHE):
+    """Every CSV under the roots (default: the whole repo), leaving out the cache itself."""
+    paths = []
+    for root in roots or [REPO_ROOT]:
+        paths += glob.glob(os.path.join(root, '**', '*.csv'), recursive=True)
+    cache_dir = os.path.abspath(cache_dir)
+    return sorted(p for p in paths if not os.path.abspath(p).startswith(cache_dir + os.sep))
+
+
+def normalize_file(path):
+    """
+    The run as {canonical column: float64 array} with every column in CANONICAL, or None
+    if the header is not a known dialect (no power or RPM column).
+    """
+    columns = read_run_csv(path)
+    if 'power' not in columns or 'rpm' not in columns:
+        return None
+    rows = len(columns['power'])
+    return {name: columns[name].astype(float) if name in columns else np.full(rows, np.nan)
+            for name in CANONICAL}
+
+
+def partition_of(path, columns):
+    """'date=YYYY-MM-DD/windspeed=WW.WW' for a run, from its name or else its mtime and data."""
+    meta = parse_run_name(path)
+    if meta is not None:
+        date, windspeed = meta['started'][:10], meta['windspeed']
+    else:
+        date = datetime.date.fromtimestamp(os.path.getmtime(path)).isoformat()
+        finite = columns['windspeed'][np.isfinite(columns['windspeed'])]
+        windspeed = float(np.median(finite)) if len(finite) else -1.0
+    return f"date={date}/windspeed={windspeed:05.2f}"
+
+
+def _convert(path):
+    """Worker: read and normalize one CSV. Returns (path, header, partition, columns or None, error)."""
+    try:
+        with open(path) as f:
+            header = f.readline().strip()
+        columns = normalize_file(path)
+        partition = partition_of(path, columns) if columns is not None else None
+        return path, header, partition, columns, None
+    except (OSError, ValueError) as err:
+        return path, None, None, None, str(err)
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, MANIFEST)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'next_run': 0, 'runs': {}}
+
+
+def _write_atomic(path, write):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _read_partition(cache_dir, partition):
+    path = os.path.join(cache_dir, partition, PART)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as part:
+        return {name: part[name] for name in part.files}
+
+
+def ingest(cache_dir=DEFAULT_CACHE, roots=None, workers=None, verbose=False):
+    """
+    Bring the cache up to date with the CSVs on disk. Returns counts of converted, removed,
+    unchanged, empty (header only, left out quietly) and skipped (unknown dialect or
+    unreadable) files.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest = _read_manifest(cache_dir)
+    runs = manifest['runs']
+    counts = {'converted': 0, 'removed': 0, 'unchanged': 0, 'empty': 0, 'skipped': 0}
+
+    sources = {}
+    for full_path in find_sources(roots, cache_dir):
+        sources[os.path.relpath(full_path, REPO_ROOT).replace(os.sep, '/')] = full_path
+    changed = []
+    for path, full_path in sources.items():
+        st = os.stat(full_path)
+        entry = runs.get(path)
+        if entry is not None and (entry['mtime'], entry['size']) == (st.st_mtime, st.st_size):
+            counts['unchanged'] += 1
+        else:
+            changed.append(path)
+    gone = [path for path in runs if path not in sources]
+
+    # Partitions that lose rows (changed or deleted runs) or gain them (converted runs)
+    touched = {runs[path]['partition'] for path in changed + gone if path in runs}
+    for path in gone:
+        del runs[path]
+    counts['removed'] = len(gone)
+
+    if len(changed) > 1 and workers != 1:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_convert, [sources[p] for p in changed], chunksize=4))
+    else:
+        results = [_convert(sources[p]) for p in changed]
+
+    new_rows = {}   # partition -> list of (run id, columns)
+    for path, (_, header, partition, columns, error) in zip(changed, results):
+        if columns is not None and len(columns['power']) == 0:
+            runs.pop(path, None)
+            counts['empty'] += 1
+            continue
+        if columns is None:
+            runs.pop(path, None)
+            counts['skipped'] += 1
+            if verbose:
+                print(f"WARNING : skipped {path}: {error or 'unknown header dialect'}")
+            continue
+        run = runs[path]['run'] if path in runs else manifest['next_run']
+        manifest['next_run'] = max(manifest['next_run'], run + 1)
+        st = os.stat(sources[path])
+        runs[path] = {'run': run, 'partition': partition, 'rows': len(columns['power']),
+                      'header': header, 'mtime': st.st_mtime, 'size': st.st_size}
+        new_rows.setdefault(partition, []).append((run, columns))
+        touched.add(partition)
+        counts['converted'] += 1
+
+    for partition in touched:
+        keep = {entry['run'] for entry in runs.values() if entry['partition'] == partition}
+        keep -= {run for run, _ in new_rows.get(partition, [])}
+        blocks = []
+        old = _read_partition(cache_dir, partition)
+        if old is not None:
+            mask = np.isin(old['run'], list(keep))
+            blocks.append({name: values[mask] for name, values in old.items()})
+        for run, columns in new_rows.get(partition, []):
+            blocks.append(dict(columns, run=np.full(len(columns['power']), run, dtype=np.int32)))
+        merged = {name: np.concatenate([block[name] for block in blocks]) if blocks
+                  else np.zeros(0, dtype=np.int32 if name == 'run' else float)
+                  for name in CANONICAL + ('run',)}
+        folder = os.path.join(cache_dir, partition)
+        if len(merged['run']) == 0:
+            if os.path.exists(os.path.join(folder, PART)):
+                os.remove(os.path.join(folder, PART))
+                os.removedirs(folder)   # and the date folder if that was its last wind speed
+            continue
+        os.makedirs(folder, exist_ok=True)
+        _write_atomic(os.path.join(folder, PART), lambda f: np.savez(f, **merged))
+
+    _write_atomic(os.path.join(cache_dir, MANIFEST),
+                  lambda f: f.write(json.dumps(manifest, indent=1).encode('utf-8')))
+    return counts
+
+
+def load_history(cache_dir=DEFAULT_CACHE, columns=None, partitions='*/*'):
+    """
+    Every cached run in one go: (data, runs) where data maps each column (and 'run') to one
+    array over all rows, and runs maps a run id to its manifest entry plus 'path'. partitions
+    is a glob over the partition folders, e.g. 'date=2025-05-*/windspeed=10.00'.
+    """
+    manifest = _read_manifest(cache_dir)
+    runs = {entry['run']: dict(entry, path=path) for path, entry in manifest['runs'].items()}
+    names = list(columns or CANONICAL) + ['run']
+    blocks = {name: [] for name in names}
+    for part_path in sorted(glob.glob(os.path.join(cache_dir, partitions, PART))):
+        with np.load(part_path) as part:
+            for name in names:
+                blocks[name].append(part[name])
+    data = {name: np.concatenate(values) if values else np.zeros(0, dtype=np.int32 if name == 'run' else float)
+            for name, values in blocks.items()}
+    return data, runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.ingest',
+                                     description="Convert every logged CSV into one columnar cache.")
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--root', action='append', default=None, help="folder to scan instead of the repo; repeatable")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument('--info', action='store_true', help="only describe the cache")
+    args = parser.parse_args(argv)
+
+    if not args.info:
+        start = time.perf_counter()
+        counts = ingest(args.cache, args.root, args.workers, verbose=True)
+        print(f"SUCCESS : {args.cache} updated in {time.perf_counter() - start:.2f} s "
+              + ", ".join(f"{n} {k}" for k, n in counts.items()))
+
+    start = time.perf_counter()
+    data, runs = load_history(args.cache)
+    elapsed = time.perf_counter() - start
+    partitions = sorted({entry['partition'] for entry in runs.values()})
+    print(f"INFO : {len(runs)} runs, {len(data['run'])} rows in {len(partitions)} partitions "
+          f"(loaded in {elapsed * 1000:.1f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
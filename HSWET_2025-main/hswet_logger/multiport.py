@@ -0,0 +1,188 @@
+"""
+Log several serial ports from one process, e.g. the turbine board and the load/safety box.
+
+    python -m hswet_logger.multiport --windspeed 10 --port COM6 --port COM7:cwc
+
+Each --port is PORT or PORT:SCHEMA (default: detect, as in the single-port CLI). Every port
+gets its own asyncio task, so a quiet board never holds up the others, and every frame
+is stamped with one shared monotonic host clock (seconds since the start of the run),
+written as an extra "Host Time (s)" column at the end of that port's CSV. Each port goes to
+its own CSV and .bin file. When the run ends, merge_streams() writes a merged CSV that
+lines the streams up on the union of their host times, using each stream's latest frame
+at every time.
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .cli import read_header, reset_arduino, run_filename
+from .writer import ChunkedWriter, read_binary
+
+HOST_TIME_HEADER = 'Host Time (s)'
+
+
+class PortStream:
+    """One port being logged: its serial object, decoder, writer and counters."""
+
+    def __init__(self, name, ser, schema, margins, leftover, filename, windspeed, chunk_rows=20):
+        self.name = name
+        self.ser = ser
+        self.schema = schema
+        self.margins = margins
+        self.leftover = leftover
+        self.filename = filename
+        self.binary_path = filename[:-len('.csv')] + '.bin'
+        self.windspeed = windspeed
+        self.decoder = schema.decoder(on_text=lambda line: print(f"\n{name} : {line}"))
+        self.header = schema.header + ', ' + HOST_TIME_HEADER
+        self.writer = ChunkedWriter(filename, self.header, chunk_rows=chunk_rows,
+                                    binary_path=self.binary_path, fmt='%.3f',
+                                    meta={'windspeed': windspeed, 'schema': schema.name,
+                                          'rpm_margins': margins, 'port': name})
+        self.finished = False
+        self.latest = None
+
+    def log(self, frames, host_time):
+        """Write frames read at host_time; returns True once the end signal has been seen."""
+        end = self.schema.end_index(frames)
+        if end is not None:
+            frames = frames[:end]
+            self.finished = True
+        if len(frames):
+            rows = self.schema.rows(frames, self.windspeed)
+            self.writer.write(np.column_stack((rows, np.full(len(frames), host_time))))
+            self.latest = frames[-1]
+        return self.finished
+
+
+async def log_port(stream, t0_ns):
+    """Read one port until its end signal (or cancellation), stamping frames with the shared clock."""
+    loop = asyncio.get_running_loop()
+    ser = stream.ser
+    try:
+        stream.log(stream.decoder.feed_array(stream.leftover), (time.monotonic_ns() - t0_ns) / 1e9)
+        while not stream.finished:
+            # pyserial has no asyncio API, so each blocking read (<= timeout) runs in a worker thread
+            try:
+                data = await loop.run_in_executor(None, lambda: ser.read(ser.in_waiting or stream.decoder.size))
+            except OSError as err:  # SerialException: board unplugged or port closed
+                print(f"\nERROR : {stream.name} stopped: {err}")
+                stream.finished = True
+                break
+            host_time = (time.monotonic_ns() - t0_ns) / 1e9
+            if data:
+                stream.log(stream.decoder.feed_array(data), host_time)
+    finally:
+        stream.writer.close()
+
+
+async def show_status(streams, status_hz):
+    while True:
+        await asyncio.sleep(1 / status_hz)
+        parts = []
+        for stream in streams:
+            state = 'done' if stream.finished else f"{stream.decoder.frames} frames"
+            parts.append(f"{stream.name}: {state}")
+        print("\r" + " | ".join(parts), end="", flush=True)
+
+
+async def log_ports(streams, status_hz=5.0):
+    """Log all streams concurrently until every one has sent its end signal."""
+    t0_ns = time.monotonic_ns()
+    status = asyncio.ensure_future(show_status(streams, status_hz))
+    try:
+        await asyncio.gather(*(log_port(stream, t0_ns) for stream in streams))
+    finally:
+        status.cancel()
+
+
+def merge_streams(streams, out_path):
+    """
+    Write one CSV aligned on the host clock: a row per frame of any stream, with every
+    stream's most recent frame at that time (NaN before its first frame).
+    """
+    tables = []
+    for stream in streams:
+        tables.append(read_binary(stream.binary_path).astype(float))
+    times = np.unique(np.concatenate([table[:, -1] for table in tables]))
+    merged = [times[:, None]]
+    header = [HOST_TIME_HEADER]
+    for stream, table in zip(streams, tables):
+        idx = np.searchsorted(table[:, -1], times, side='right') - 1
+        block = np.full((len(times), table.shape[1] - 1), np.nan)
+        have = idx >= 0
+        block[have] = table[idx[have], :-1]
+        merged.append(block)
+        header += [f"{stream.name}: {col.strip()}" for col in stream.schema.header.split(',')]
+    np.savetxt(out_path, np.hstack(merged), delimiter=',', header=', '.join(header),
+               comments='', fmt='%.3f')
+    return out_path
+
+
+def parse_port(spec):
+    """'COM6' -> ('COM6', 'auto'); 'COM6:cwc' -> ('COM6', 'cwc')."""
+    port, _, schema = spec.partition(':')
+    return port, schema or 'auto'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.multiport',
+                                     description="Log several Arduino serial ports at once.")
+    parser.add_argument('--port', action='append', required=True, help="PORT or PORT:SCHEMA; repeat per board")
+    parser.add_argument('--windspeed', type=float, required=True)
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--rload', default='sweep')
+    parser.add_argument('--date', default=datetime.date.today().strftime("%m-%d-%Y"))
+    parser.add_argument('--out', default='data_logged')
+    parser.add_argument('--no-reset', action='store_true')
+    args = parser.parse_args(argv)
+
+    import serial
+
+    folder = f"{args.out}/{args.date}"
+    os.makedirs(folder, exist_ok=True)
+    now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+    ports = [parse_port(spec) for spec in args.port]
+    sers = [serial.Serial(port, args.baud, timeout=0.1) for port, _ in ports]
+    if not args.no_reset:
+        for ser in sers:
+            reset_arduino(ser)
+    # Listen to every board at once while the schemas are detected, so none of them overflows
+    with ThreadPoolExecutor(len(sers)) as pool:
+        headers = list(pool.map(read_header, sers, [schema_name for _, schema_name in ports]))
+
+    streams = []
+    for (port, _), ser, (schema, margins, leftover) in zip(ports, sers, headers):
+        name = os.path.basename(port)
+        filename = run_filename(folder, schema, args.windspeed, args.rload, margins, now)
+        filename = filename[:-len('.csv')] + f"_{name}.csv"
+        print(f"INFO : {port} -> schema '{schema.name}', logging into {filename}")
+        streams.append(PortStream(name, ser, schema, margins, leftover, filename, args.windspeed))
+
+    try:
+        asyncio.run(log_ports(streams))
+        print("\nINFO : All ports sent their end signal.")
+    except KeyboardInterrupt:
+        print("\nWARNING : KeyboardInterrupt received. Finalizing and saving data...")
+    finally:
+        for stream in streams:
+            stream.writer.close()
+            stream.ser.close()
+
+    merged = merge_streams(streams, f"{folder}/merged_{args.rload}_{now}.csv")
+    for stream in streams:
+        stats = stream.decoder.stats()
+        print(f"SUCCESS : {stream.filename} ({stream.writer.rows_written} rows, {stats['resyncs']} resyncs)")
+    print(f"SUCCESS : merged view saved to {merged}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,223 @@
+"""
+Steady-state plateaus of pitch/load sweeps.
+
+step02_CWC_ctrl_box.ino holds every (pitch, r_loads[j]) setting for settingHoldTime, so a
+logged sweep is a flat sequence of plateaus with a settling transient after every step.
+segment_plateaus() cuts it into plateaus and summarizes each one:
+  - a plateau starts wherever the run, the pitch or the load setting changes,
+  - and also at step changes in power or RPM inside one setting (the turbine stalling or
+    the wind being changed), found by comparing the means of the window samples before
+    and after each row against the run's noise level, once the signal has been steady,
+  - the first settle samples of every plateau are dropped as transient, and so are the
+    samples after them while a signal is still ramping,
+  - misaligned frames (garbage beyond MAX_VALUE) neither start a setting nor a step,
+  - mean, std and sample count of each signal come from differences of cumulative sums
+    (non-finite values and values beyond MAX_VALUE are not counted).
+Everything works on the flat arrays, so any number of runs concatenated together (e.g.
+ingest.load_history(), whose 'run' column keeps them apart) are segmented in one pass.
+
+    python -m hswet_logger.plateaus RUN.csv [RUN.csv ...]
+"""
+import argparse
+import sys
+
+import numpy as np
+
+from .csvlog import read_run_csv
+
+# Noise floor for the step detector: the CSVs are rounded to 0.01
+RESOLUTION = 0.01
+# Larger values are garbage from misaligned frames in old runs (up to 1e63). They are left
+# out, as they would also wipe out the precision of every cumulative sum after them.
+MAX_VALUE = 1e6
+# The rotor takes about 2 s to settle after a step: 8 samples at the sketch's 250 ms interval
+SETTLE = 8
+
+
+def _group_starts(ids):
+    """Start index of each run of equal values in a sorted or blocked id array."""
+    return np.flatnonzero(np.diff(ids, prepend=ids[:1] - 1) != 0) if len(ids) else np.zeros(0, dtype=np.intp)
+
+
+def noise_level(values, group):
+    """
+    Robust per-row noise std of values: from the median absolute first difference within
+    each group (1.4826 * MAD / sqrt(2) for independent noise), never below RESOLUTION.
+    """
+    n = len(values)
+    sigma = np.full(n, RESOLUTION)
+    if n < 2:
+        return sigma
+    diff = np.abs(np.diff(values))
+    same = group[1:] == group[:-1]
+    diff, dgroup = diff[same], group[1:][same]
+    if len(diff) == 0:
+        return sigma
+    order = np.lexsort((diff, dgroup))
+    starts = _group_starts(dgroup[order])
+    counts = np.diff(np.append(starts, len(order)))
+    median = diff[order][starts + counts // 2] * 1.4826 / np.sqrt(2)
+    groups = dgroup[order][starts]
+    # Rows of a group with no differences (a single row) keep the floor
+    idx = np.searchsorted(groups, group)
+    found = (idx < len(groups)) & (groups[np.minimum(idx, len(groups) - 1)] == group)
+    sigma[found] = np.maximum(median[idx[found]], RESOLUTION)
+    return sigma
+
+
+def step_scores(values, segment, window=4, sigma=None):
+    """
+    Per row: how far the mean of the window rows from there on is from the mean of the
+    window rows before, in standard errors. 0 where the windows would cross a segment
+    boundary or the ends of values.
+    """
+    n = len(values)
+    score = np.zeros(n)
+    if n < 2 * window:
+        return score
+    if sigma is None:
+        sigma = noise_level(values, segment)
+    cs = np.concatenate(([0.0], np.cumsum(values)))
+    i = np.arange(window, n - window + 1)
+    i = i[segment[i - window] == segment[i + window - 1]]
+    before = (cs[i] - cs[i - window]) / window
+    after = (cs[i + window] - cs[i]) / window
+    score[i] = np.abs(after - before) / (sigma[i] * np.sqrt(2 / window))
+    return score
+
+
+def step_points(values, segment, window=4, threshold=6.0, sigma=None, settle=0):
+    """
+    Boolean array, True at rows where values steps: the step_scores() there is above
+    threshold and the largest within window rows. Windows never reach across segment
+    boundaries or into the first settle rows of a segment (the transient after a setting
+    change is not a new plateau), and the signal must have been steady over the window
+    before (score at most threshold there), so a slow settling ramp is not cut into a
+    series of steps.
+    """
+    n = len(values)
+    score = step_scores(values, segment, window, sigma)
+    segment_start = np.maximum.accumulate(np.where(np.diff(segment, prepend=segment[:1] - 1) != 0, np.arange(n), 0))
+    steady_before = np.zeros(n, dtype=bool)
+    steady_before[window:] = score[:-window] <= threshold
+    score = np.where((np.arange(n) - window - segment_start >= settle) & steady_before, score, 0.0)
+    # Local maximum: strictly above the rows before, at least the rows after
+    peak = score > threshold
+    for k in range(1, window + 1):
+        peak[k:] &= score[k:] > score[:-k]
+        peak[:-k] &= score[:-k] >= score[k:]
+    return peak
+
+
+def segment_plateaus(data, keys=('run', 'pitch', 'load_setting'), signals=('power', 'rpm'),
+                     settle=SETTLE, window=4, threshold=6.0):
+    """
+    Plateaus of data (dict of equal-length arrays; keys missing from it are ignored).
+    Returns a dict of arrays with one entry per plateau: start and stop (row range in
+    data, before dropping the transient), the key values, samples (rows kept after the
+    transient) and <signal>_mean / <signal>_std for every signal (NaN when a plateau has
+    no valid value of it). The transient is the first settle rows (but never more than
+    half of a plateau) and then any rows where a signal is still moving (step_scores()
+    above threshold), so a ramp that outlasts settle is not averaged into the plateau.
+    """
+    keys = [key for key in keys if key in data]
+    n = len(data[signals[0]])
+    if n == 0:
+        empty = {name: np.zeros(0) for name in ['start', 'stop', 'samples', *keys]}
+        empty.update({f'{s}_{stat}': np.zeros(0) for s in signals for stat in ('mean', 'std')})
+        return empty
+
+    # Misaligned frames have garbage in every column: they keep the settings of the row
+    # before them instead of starting settings of their own. Garbage is a value beyond
+    # MAX_VALUE, or a key that differs from the rows on both sides while they agree (no
+    # sketch holds a setting for a single sample).
+    garbage = np.zeros(n, dtype=bool)
+    for name in [*keys, *signals]:
+        garbage |= np.abs(np.asarray(data[name], dtype=float)) >= MAX_VALUE
+    for key in keys:
+        k = np.nan_to_num(np.asarray(data[key], dtype=float), nan=-1.0)
+        garbage[1:-1] |= (k[1:-1] != k[:-2]) & (k[:-2] == k[2:])
+    source = np.maximum.accumulate(np.where(garbage, 0, np.arange(n)))
+    key_values = {key: np.asarray(data[key])[source] for key in keys}
+
+    # Settings: a new one wherever any key changes
+    change = np.zeros(n, dtype=bool)
+    change[0] = True
+    for key in keys:
+        k = np.nan_to_num(key_values[key].astype(float), nan=-1.0)
+        change[1:] |= k[1:] != k[:-1]
+    setting = np.cumsum(change)
+    run = np.asarray(data['run']) if 'run' in data else np.zeros(n, dtype=np.int64)
+
+    # Steps in the signals within a setting
+    values, valid = {}, {}
+    for s in signals:
+        v = np.asarray(data[s], dtype=float)
+        valid[s] = np.isfinite(v) & ~garbage
+        # Invalid rows repeat the last valid value, so they look like no step at all
+        values[s] = np.where(valid[s], v, 0.0)[np.maximum.accumulate(np.where(valid[s], np.arange(n), 0))]
+    moving = np.zeros(n, dtype=bool)
+    for s in signals:
+        sigma = noise_level(values[s], run)
+        change |= step_points(values[s], setting, window, threshold, sigma, settle)
+        moving |= step_scores(values[s], setting, window, sigma) > threshold
+
+    plateau = np.cumsum(change) - 1
+    start = np.flatnonzero(change)
+    stop = np.append(start[1:], n)
+    length = stop - start
+    drop = np.minimum(settle, length // 2)
+    # Then on to the next row where every signal is still
+    next_still = np.minimum.accumulate(np.where(moving, n, np.arange(n))[::-1])[::-1]
+    first = np.minimum(next_still[start + drop], stop)
+    samples = stop - first
+
+    result = {'start': start, 'stop': stop, 'samples': samples}
+    for key in keys:
+        result[key] = key_values[key][start]
+    for s in signals:
+        # Centred on each plateau's first value, so the sums stay small and E[x^2] - E[x]^2
+        # keeps its precision over many concatenated runs
+        ref = values[s][start]
+        v = np.where(valid[s], values[s] - ref[plateau], 0.0)
+        cs = np.concatenate(([0.0], np.cumsum(v)))
+        cs2 = np.concatenate(([0.0], np.cumsum(v * v)))
+        count = np.concatenate(([0], np.cumsum(valid[s])))
+        used = count[stop] - count[first]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = (cs[stop] - cs[first]) / used
+            var = (cs2[stop] - cs2[first]) / used - mean ** 2
+        result[f'{s}_mean'] = mean + ref
+        result[f'{s}_std'] = np.sqrt(np.maximum(var, 0.0))
+    result['plateau_of_row'] = plateau
+    return result
+
+
+def segment_csv(path, **kwargs):
+    """segment_plateaus() for one logged CSV (any header dialect)."""
+    return segment_plateaus(read_run_csv(path), **kwargs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.plateaus',
+                                     description="Steady-state plateaus of logged sweeps.")
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--settle', type=int, default=SETTLE, help="samples dropped at the start of each plateau")
+    parser.add_argument('--window', type=int, default=4, help="samples on each side for step detection")
+    parser.add_argument('--threshold', type=float, default=6.0, help="step size in standard errors")
+    args = parser.parse_args(argv)
+    for path in args.paths:
+        result = segment_csv(path, settle=args.settle, window=args.window, threshold=args.threshold)
+        print(f"{path}: {len(result['start'])} plateaus")
+        print("  rows          pitch  load  samples  power mean (std)    rpm mean (std)")
+        for k in range(len(result['start'])):
+            pitch = result.get('pitch', np.full(len(result['start']), np.nan))[k]
+            load = result.get('load_setting', np.full(len(result['start']), np.nan))[k]
+            print(f"  {result['start'][k]:>5d}-{result['stop'][k]:<6d}  {pitch:6.0f} {load:5.0f}  "
+                  f"{result['samples'][k]:>7d}  {result['power_mean'][k]:8.2f} ({result['power_std'][k]:6.2f})  "
+                  f"{result['rpm_mean'][k]:8.0f} ({result['rpm_std'][k]:6.0f})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Background serial reader.
+
+Printing every frame on the thread that reads the port is slow enough on a Windows
+console that the UART buffer backs up. SerialReader moves the port reads and decoding to a
+daemon thread that pushes frames into a FrameRing; the main thread drains the ring at its
+own pace (writing to disk, refreshing a status line) and never blocks the reader.
+
+If the consumer falls behind by more than the ring capacity, the oldest frames are
+overwritten and counted in FrameRing.overflowed. The latency counters measure the time
+from a frame being read off the port to it being drained by the consumer.
+"""
+import threading
+import time
+
+import numpy as np
+
+
+class FrameRing:
+    """Bounded ring buffer of decoded frames (structured array rows) with arrival times."""
+
+    def __init__(self, dtype, capacity=4096):
+        self.capacity = capacity
+        self.frames = np.zeros(capacity, dtype=dtype)
+        self.arrived = np.zeros(capacity)
+        self.head = 0   # total frames pushed
+        self.tail = 0   # total frames popped (or overwritten)
+        self.overflowed = 0
+        self.lock = threading.Lock()
+
+    def push(self, frames, arrived):
+        """Append frames that were read at time arrived (time.perf_counter())."""
+        n = len(frames)
+        if n == 0:
+            return
+        with self.lock:
+            # Only the newest capacity frames can fit
+            skip = max(0, n - self.capacity)
+            idx = (self.head + skip + np.arange(n - skip)) % self.capacity
+            self.frames[idx] = frames[skip:]
+            self.arrived[idx] = arrived
+            self.head += n
+            if self.head - self.tail > self.capacity:
+                self.overflowed += self.head - self.tail - self.capacity
+                self.tail = self.head - self.capacity
+
+    def pop_all(self):
+        """Remove and return (frames, arrival times) of everything in the ring, oldest first."""
+        with self.lock:
+            idx = np.arange(self.tail, self.head) % self.capacity
+            self.tail = self.head
+            return self.frames[idx], self.arrived[idx]
+
+    def __len__(self):
+        return self.head - self.tail
+
+
+class SerialReader(threading.Thread):
+    """
+    Thread that reads the port, decodes with decoder.feed_array and pushes into self.ring.
+    Call stop() to end it; any frames still in the ring can then be drained with drain().
+    """
+
+    def __init__(self, ser, decoder, capacity=4096):
+        super().__init__(daemon=True)
+        self.ser = ser
+        self.decoder = decoder
+        self.ring = FrameRing(decoder.dtype, capacity)
+        self.running = True
+        self.error = None
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self.latency_sum = 0.0
+        self.drained = 0
+
+    def run(self):
+        try:
+            while self.running:
+                data = self.ser.read(self.ser.in_waiting or self.decoder.size)
+                if data:
+                    self.ring.push(self.decoder.feed_array(data), time.perf_counter())
+        except Exception as err:  # a pulled USB cable should end the run, not hang it
+            self.error = err
+            self.running = False
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.join(timeout)
+
+    def drain(self):
+        """Frames read since the last drain (structured array), updating the latency counters."""
+        frames, arrived = self.ring.pop_all()
+        if len(frames):
+            latency = time.perf_counter() - arrived
+            self.latency_last = float(latency[-1])
+            self.latency_max = max(self.latency_max, float(latency.max()))
+            self.latency_sum += float(latency.sum())
+            self.drained += len(frames)
+        return frames
+
+    def stats(self):
+        """Ring and latency counters (seconds) as a dict."""
+        return {'buffered': len(self.ring), 'overflowed': self.ring.overflowed,
+                'latency_last': self.latency_last, 'latency_max': self.latency_max,
+                'latency_mean': self.latency_sum / self.drained if self.drained else 0.0}
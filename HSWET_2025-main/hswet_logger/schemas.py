@@ -0,0 +1,179 @@
+"""
+Registry of the frame layouts the turbine sketches have sent over the seasons.
+
+Each FrameSchema says how to decode a frame (struct format, field names, plausibility
+limits), how the run ends, and how a decoded frame becomes a CSV row in the dialect the
+analysis scripts already read for that season. New sketches get a register_schema() call
+here instead of another copy of the logger.
+
+detect_schema() picks the schema for a port that is already talking: the step04 sketch
+announces itself with an "RPM_MARGINS:high,low" line, and the others are told apart by
+how much of a sample of the stream decodes as plausible frames for each layout.
+"""
+import numpy as np
+
+from .frames import FrameDecoder
+
+SCHEMAS = {}
+
+
+class FrameSchema:
+    """
+    One frame layout. rows(frames, windspeed) turns a structured frame array into the CSV
+    rows (one column per name in header). end is 'minus_one' when the sketch sends an all -1
+    frame at the end of the sweep, 'negative' when any all-negative frame ends it, or None
+    when the run only ends with CTRL+C.
+    """
+
+    def __init__(self, name, fields, limits, header, rows, end='minus_one', margins=False,
+                 description=''):
+        self.name = name
+        self.fields = tuple(fields)
+        self.struct_format = '<' + 'f' * len(fields)
+        self.limits = limits
+        self.header = header
+        self.rows = rows
+        self.end = end
+        self.margins = margins
+        self.description = description
+
+    def decoder(self, on_text=None):
+        return FrameDecoder(self.struct_format, limits=self.limits, on_text=on_text,
+                            field_names=self.fields)
+
+    def end_index(self, frames):
+        """Index of the frame that ends the run, or None. The end frame itself is not logged."""
+        if self.end is None or len(frames) == 0:
+            return None
+        plain = frames.view(np.float32).reshape(len(frames), -1)
+        hits = np.all(plain == -1, axis=1) if self.end == 'minus_one' else np.all(plain < 0, axis=1)
+        hits = np.nonzero(hits)[0]
+        return int(hits[0]) if len(hits) else None
+
+
+def register_schema(schema):
+    SCHEMAS[schema.name] = schema
+    return schema
+
+
+def get_schema(name):
+    if name not in SCHEMAS:
+        raise KeyError(f"Unknown frame schema {name!r}; known: {', '.join(sorted(SCHEMAS))}")
+    return SCHEMAS[name]
+
+
+def _resistance(voltages, currents):
+    return np.divide(voltages, currents, out=np.zeros_like(voltages), where=currents != 0)
+
+
+def _column(frames, name):
+    return frames[name].astype(float)
+
+
+def _fa24_rows(frames, windspeed):
+    v, i = _column(frames, 'voltage'), _column(frames, 'current')
+    return np.column_stack((np.full(len(frames), windspeed), _column(frames, 'pitch'), v, i,
+                            _resistance(v, i), v * i, _column(frames, 'rpm'),
+                            _column(frames, 'load_setting')))
+
+
+def _acquisition_rows(frames, windspeed):
+    v, i = _column(frames, 'voltage'), _column(frames, 'current')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = v / i  # inf/nan with no current, as data_acquisition.py always wrote it
+    return np.column_stack((np.full(len(frames), windspeed), v, i, r, v * i, _column(frames, 'rpm'),
+                            _column(frames, 'pitch'), _column(frames, 'load_setting')))
+
+
+def _sp25_rows(frames, windspeed):
+    v, i = _column(frames, 'voltage'), _column(frames, 'current')
+    return np.column_stack((np.full(len(frames), windspeed), _column(frames, 'pitch'), v, i,
+                            _resistance(v, i), _column(frames, 'power'), _column(frames, 'rpm'),
+                            _column(frames, 'load_setting')))
+
+
+def _cwc_rows(frames, windspeed):
+    return np.column_stack((np.full(len(frames), windspeed),
+                            *[_column(frames, name) for name in
+                              ('pitch', 'voltage', 'current', 'power', 'rpm', 'load_setting', 'r_measured')]))
+
+
+def _step04_rows(frames, windspeed):
+    v, i = _column(frames, 'voltage'), _column(frames, 'current')
+    return np.column_stack((np.full(len(frames), windspeed), _column(frames, 'pitch'),
+                            _column(frames, 'timestamp'), v, i, _resistance(v, i),
+                            _column(frames, 'power'), _column(frames, 'rpm'),
+                            _column(frames, 'load_setting')))
+
+
+STEP02_HEADER = 'Windspeed (m/s), Pitch, Voltage (V), Current (A), Resistance (ohm), Power (W), RPM, Load Setting'
+
+FA24 = register_schema(FrameSchema(
+    'fa24', ('voltage', 'current', 'rpm', 'pitch', 'load_setting'),
+    [(-1, 100), (-1, 50), (-1, 10000), (-1, 3000), (-1, 1000)],
+    STEP02_HEADER, _fa24_rows, end='negative',
+    description="FA24 / 2024 competition sketches: 5 floats, power computed on the host"))
+
+# Same frames, written in the older CSV dialect. detect_schema() cannot tell the two apart
+# and picks fa24, the first registered.
+register_schema(FrameSchema(
+    'fa24_acq', FA24.fields, FA24.limits,
+    'Windspeeds, Voltages, Currents, Resistances, Powers, RPMs, Pitches, Load settings',
+    _acquisition_rows, end='negative',
+    description="FA24 frames in the CSV columns of 2024 sweep_pitches/data_acquisition.py"))
+
+register_schema(FrameSchema(
+    'sp25', ('voltage', 'current', 'power', 'rpm', 'pitch', 'load_setting'),
+    [(-1, 100), (-1, 50), (-1, 2000), (-1, 10000), (-1, 3000), (-1, 1000)],
+    STEP02_HEADER, _sp25_rows,
+    description="SP25 pitch sweep (step01_SP25_arduino_sweep_pitches.ino): 6 floats"))
+
+register_schema(FrameSchema(
+    'cwc', ('voltage', 'current', 'power', 'rpm', 'pitch', 'load_setting', 'r_measured'),
+    [(-1, 100), (-1, 50), (-1, 2000), (-1, 10000), (1000, 2000), (0, 100), (-1, 1e7)],
+    'Windspeed (m/s), Pitch, Voltage (V), Current (A), Power (W), RPM, R Load (Ohms), Resistance (ohm)',
+    _cwc_rows,
+    description="CWC control box load sweep (step02_CWC_ctrl_box.ino): 7 floats with measured R"))
+
+register_schema(FrameSchema(
+    'step04', ('timestamp', 'voltage', 'current', 'power', 'rpm', 'pitch', 'load_setting'),
+    [(0, 1e7), (-1, 100), (-1, 50), (-1, 2000), (-1, 10000), (-2000, 2000), (-1, 1000)],
+    'Windspeed (m/s), Pitch, Time, Voltage (V), Current (A), Resistance (ohm), Power (W), RPM, Load Setting',
+    _step04_rows, end=None, margins=True,
+    description="2025 competition sketch: RPM_MARGINS header, then 7 floats starting with a timestamp"))
+
+
+def parse_margins(line):
+    """(high, low) from an 'RPM_MARGINS:high,low' line, or None if it is not one."""
+    line = line.strip()
+    if not line.startswith("RPM_MARGINS:"):
+        return None
+    high_str, low_str = line.split(":", 1)[1].split(",")
+    return int(high_str), int(low_str)
+
+
+def detect_schema(sample, candidates=None):
+    """
+    Guess the schema from a sample of raw bytes read from the port. Returns (schema, margins)
+    where margins is (high, low) if an RPM_MARGINS line was seen, else None.
+
+    Without the header, every candidate layout decodes the sample and the one whose
+    plausible frames cover the largest share of the bytes wins (misaligned layouts give
+    implausible floats almost every frame).
+    """
+    for raw in bytes(sample).split(b'\n'):
+        margins = parse_margins(raw.decode('ascii', errors='ignore'))
+        if margins is not None:
+            schema = next(s for s in SCHEMAS.values() if s.margins)
+            return schema, margins
+
+    best, best_coverage = None, -1.0
+    for schema in (candidates or SCHEMAS.values()):
+        if schema.margins:
+            continue
+        decoder = schema.decoder()
+        frames = decoder.feed_array(bytes(sample))
+        coverage = len(frames) * decoder.size / max(len(sample), 1)
+        if coverage > best_coverage:
+            best, best_coverage = schema, coverage
+    return best, None
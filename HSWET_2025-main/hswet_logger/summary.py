@@ -0,0 +1,152 @@
+"""
+Power-curve summary of every logged run, from the columnar cache of ingest.py.
+
+    python -m hswet_logger.summary                 # ingest first, then write the tables
+    python -m hswet_logger.summary --out-dir HSWET/Figures
+
+Writes, once per call:
+  - power_summary_runs.csv: one row per run with its row count, mean power and the whole
+    row at its maximum power (what Turbine_data_plotter's Maxes.csv holds per file),
+  - power_summary_settings.csv: one row per (windspeed, pitch, load setting) over all runs
+    with the sample count and the mean, std and max of power and RPM,
+  - power_summary_plateaus.csv: the steady-state mean and std of power and RPM of every
+    plateau of every run, without the settling transients (see plateaus.py).
+The first two come from one sort of all rows and np.*.reduceat over the group boundaries,
+the plateaus from cumulative sums, so the cost is linear in the rows after the sort,
+however many runs there are.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from .ingest import CANONICAL, DEFAULT_CACHE, ingest, load_history
+from .plateaus import MAX_VALUE, segment_plateaus
+
+# Rows with a missing key value (e.g. no pitch column in that dialect) are grouped under this
+MISSING_KEY = -1.0
+
+
+def valid_rows(data):
+    """
+    Rows with a finite power and no value beyond MAX_VALUE in any column: misaligned frames
+    in old runs decode to garbage (up to 1e63) in every column. NaN (a column the dialect
+    does not have) is allowed anywhere else.
+    """
+    keep = np.isfinite(data['power'])
+    for name, values in data.items():
+        if name != 'run':
+            keep &= ~(np.abs(values) >= MAX_VALUE)
+    return keep
+
+
+def group_bounds(keys):
+    """
+    Sort order and group starts for rows grouped by equal values of every key array.
+    Returns (order, starts, counts): rows order[starts[g]:starts[g] + counts[g]] are group g.
+    """
+    keys = [np.where(np.isfinite(key), key, MISSING_KEY) for key in keys]
+    order = np.lexsort(keys[::-1])
+    if len(order) == 0:
+        return order, np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    change = np.zeros(len(order), dtype=bool)
+    change[0] = True
+    for key in keys:
+        sorted_key = key[order]
+        change[1:] |= sorted_key[1:] != sorted_key[:-1]
+    starts = np.flatnonzero(change)
+    counts = np.diff(np.append(starts, len(order)))
+    return order, starts, counts
+
+
+def group_stats(values, order, starts, counts):
+    """Mean, std and max of values over each group from group_bounds()."""
+    v = values[order]
+    total = np.add.reduceat(v, starts)
+    mean = total / counts
+    var = np.add.reduceat(v * v, starts) / counts - mean ** 2
+    return mean, np.sqrt(np.maximum(var, 0.0)), np.maximum.reduceat(v, starts)
+
+
+def run_maxima(data):
+    """
+    Per run: (run ids, row count, mean power, index of the max-power row in data). Rows that
+    are not valid_rows() are left out.
+    """
+    keep = np.flatnonzero(valid_rows(data))
+    run, power = data['run'][keep], data['power'][keep]
+    # Sorted by run and then power, the last row of each run is its maximum
+    order = np.lexsort((power, run))
+    starts = np.flatnonzero(np.diff(run[order], prepend=-1) != 0)
+    counts = np.diff(np.append(starts, len(order)))
+    ends = starts + counts - 1
+    mean = np.add.reduceat(power[order], starts) / counts if len(starts) else np.zeros(0)
+    return run[order][starts], counts, mean, keep[order[ends]]
+
+
+def setting_stats(data):
+    """Per (windspeed, pitch, load setting) over all runs, valid_rows() only: dict of column -> array."""
+    keep = valid_rows(data)
+    cols = {name: values[keep] for name, values in data.items()}
+    order, starts, counts = group_bounds([cols['windspeed'], cols['pitch'], cols['load_setting']])
+    table = {name: np.where(np.isfinite(cols[name]), cols[name], MISSING_KEY)[order][starts]
+             for name in ('windspeed', 'pitch', 'load_setting')}
+    table['samples'] = counts
+    for name in ('power', 'rpm'):
+        mean, std, peak = group_stats(np.nan_to_num(cols[name], nan=0.0), order, starts, counts)
+        table[f'{name}_mean'], table[f'{name}_std'], table[f'{name}_max'] = mean, std, peak
+    return table
+
+
+def _write_table(path, table, fmt='%.4g'):
+    names = list(table)
+    np.savetxt(path, np.column_stack([np.asarray(table[n], dtype=float) for n in names]),
+               delimiter=',', header=','.join(names), comments='', fmt=fmt)
+    return path
+
+
+def write_summary(out_dir, cache_dir=DEFAULT_CACHE):
+    """Write the three power_summary_*.csv tables; returns their paths."""
+    data, runs = load_history(cache_dir)
+    run_ids, counts, mean_power, at_max = run_maxima(data)
+
+    runs_path = os.path.join(out_dir, 'power_summary_runs.csv')
+    names = list(CANONICAL)
+    with open(runs_path, 'w', newline='') as f:
+        f.write('Run,Source,Rows,Mean Power,' + ','.join(f'{n} at max power' for n in names) + '\n')
+        maxima = np.column_stack([data[n][at_max] for n in names]) if len(at_max) else np.zeros((0, len(names)))
+        for run, count, mean, row in zip(run_ids, counts, mean_power, maxima):
+            values = ','.join('' if np.isnan(v) else f'{v:.4g}' for v in row)
+            f.write(f"{run},{runs[run]['path']},{count},{mean:.4g},{values}\n")
+
+    settings_path = _write_table(os.path.join(out_dir, 'power_summary_settings.csv'), setting_stats(data))
+
+    plateaus = segment_plateaus(data, keys=('run', 'windspeed', 'pitch', 'load_setting'))
+    del plateaus['plateau_of_row']
+    # Row numbers need all their digits
+    plateaus_path = _write_table(os.path.join(out_dir, 'power_summary_plateaus.csv'), plateaus, fmt='%.10g')
+    return runs_path, settings_path, plateaus_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.summary',
+                                     description="Max power per run and statistics per setting and plateau over every run.")
+    parser.add_argument('--cache', default=DEFAULT_CACHE)
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--no-ingest', action='store_true', help="use the cache as it is")
+    args = parser.parse_args(argv)
+
+    if not args.no_ingest:
+        ingest(args.cache)
+    start = time.perf_counter()
+    os.makedirs(args.out_dir, exist_ok=True)
+    for path in write_summary(args.out_dir, args.cache):
+        print(f"SUCCESS : {path}")
+    print(f"INFO : summary took {(time.perf_counter() - start) * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
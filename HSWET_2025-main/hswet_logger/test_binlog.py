@@ -0,0 +1,40 @@
+import numpy as np
+
+from .binlog import as_table, binlog_to_csv, csv_to_binlog, open_binlog
+from .writer import ChunkedWriter, read_binary
+
+HEADER = 'Windspeed (m/s), Pitch, Voltage (V), Current (A), Resistance (ohm), Power (W), RPM, Load Setting'
+
+
+def write_run(tmp_path, rows):
+    csv_path = str(tmp_path / "run.csv")
+    bin_path = str(tmp_path / "run.bin")
+    with ChunkedWriter(csv_path, HEADER, chunk_rows=4, binary_path=bin_path, meta={'windspeed': 10.0}) as writer:
+        writer.write(rows)
+    return csv_path, bin_path
+
+
+def test_round_trip(tmp_path):
+    rows = np.arange(80, dtype=float).reshape(10, 8) / 4
+    csv_path, bin_path = write_run(tmp_path, rows)
+    meta, table = open_binlog(bin_path)
+    assert meta['windspeed'] == 10.0 and meta['csv_header'] == HEADER
+    assert np.array_equal(as_table(table), rows.astype('<f4'))
+    assert np.array_equal(table['rpm'], rows[:, 6].astype('<f4'))
+
+    csv_copy = binlog_to_csv(bin_path, str(tmp_path / "copy.csv"))
+    with open(csv_path) as f, open(csv_copy) as g:
+        assert f.read() == g.read()
+    bin_copy = csv_to_binlog(csv_copy, str(tmp_path / "copy.bin"))
+    assert np.array_equal(read_binary(bin_copy), rows.astype('<f4'))
+
+
+def test_round_trip_without_rows(tmp_path):
+    # A capture stopped before the first frame arrived
+    csv_path, bin_path = write_run(tmp_path, np.zeros((0, 8)))
+    assert read_binary(bin_path).shape == (0, 8)
+    csv_copy = binlog_to_csv(bin_path, str(tmp_path / "copy.csv"))
+    with open(csv_copy) as f:
+        assert f.read().strip() == HEADER
+    bin_copy = csv_to_binlog(csv_copy, str(tmp_path / "copy.bin"))
+    assert read_binary(bin_copy).shape == (0, 8)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from .schemas import get_schema
+
+
+def frames_bytes(schema, rows):
+    """Packed frames of the schema with the given rows of field values."""
+    frames = np.zeros(len(rows), dtype=schema.decoder().dtype)
+    for k, name in enumerate(schema.fields):
+        frames[name] = [row[k] for row in rows]
+    return frames.tobytes()
+
+
+def cwc_rows(n, start=0):
+    return [(12.0, 1.5, 18.0, 3000.0 + k, 1200.0, 3.0, 8.0) for k in range(start, start + n)]
+
+
+def test_decodes_in_any_read_sizes():
+    schema = get_schema('cwc')
+    data = frames_bytes(schema, cwc_rows(50))
+    decoder = schema.decoder()
+    parts = [decoder.feed_array(data[k:k + 13]) for k in range(0, len(data), 13)]
+    frames = np.concatenate(parts)
+    assert frames['rpm'].tolist() == [3000.0 + k for k in range(50)]
+    assert decoder.stats() == {'frames': 50, 'resyncs': 0, 'dropped_bytes': 0, 'text_lines': 0}
+
+
+def test_resyncs_after_dropped_bytes():
+    schema = get_schema('cwc')
+    size = schema.decoder().size
+    data = bytearray(frames_bytes(schema, cwc_rows(20)))
+    del data[5 * size + 3:5 * size + 6]          # three bytes of frame 5 lost
+    decoder = schema.decoder()
+    frames = decoder.feed_array(bytes(data))
+    rpm = frames['rpm'].tolist()
+    # Only the damaged frame is lost
+    assert rpm == [3000.0 + k for k in range(20) if k != 5]
+    assert decoder.stats()['resyncs'] == 1
+    assert decoder.stats()['dropped_bytes'] == size - 3
+
+
+def test_text_and_garbage_between_frames():
+    schema = get_schema('cwc')
+    lines = []
+    decoder = schema.decoder(on_text=lines.append)
+    data = (frames_bytes(schema, cwc_rows(3)) + b"Brake tasks\r\n" + frames_bytes(schema, cwc_rows(3, 3))
+            + b"\x00\xff\x13" + frames_bytes(schema, cwc_rows(3, 6)))
+    frames = decoder.feed_array(data)
+    assert frames['rpm'].tolist() == [3000.0 + k for k in range(9)]
+    assert lines == ["Brake tasks"]
+    stats = decoder.stats()
+    assert stats['text_lines'] == 1 and stats['resyncs'] == 1 and stats['dropped_bytes'] == 3
+
+
+def test_end_signal():
+    schema = get_schema('cwc')
+    frames = schema.decoder().feed_array(frames_bytes(schema, cwc_rows(4) + [(-1.0,) * 7] + cwc_rows(2)))
+    assert schema.end_index(frames) == 4
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from .catalog import REPO_ROOT
+from .ingest import ingest, load_history
+
+HEADER = 'Windspeed (m/s), Pitch, Voltage (V), Current (A), Resistance (ohm), Power (W), RPM, Load Setting\n'
+
+
+def write_csv(path, rows):
+    with open(path, 'w') as f:
+        f.write(HEADER)
+        for row in rows:
+            f.write(','.join(f'{value:.2f}' for value in row) + '\n')
+
+
+@pytest.mark.filterwarnings('error')
+def test_empty_and_deleted_runs(tmp_path):
+    root, cache = tmp_path / "logs", str(tmp_path / "cache")
+    root.mkdir()
+    run_a = root / "windspeed_10_00_rload_20_2025-05-12_12-00-00.csv"
+    run_b = root / "windspeed_09_00_rload_20_2025-05-12_13-00-00.csv"
+    empty = root / "windspeed_08_00_rload_20_2025-05-12_14-00-00.csv"
+    write_csv(run_a, [(10, 1100, 20, 2, 10, 40, 4000, 0)] * 3)
+    write_csv(run_b, [(9, 1100, 15, 1.5, 10, 22.5, 3500, 0)] * 2)
+    write_csv(empty, [])
+
+    counts = ingest(cache, roots=[str(root)], workers=1)
+    assert (counts['converted'], counts['empty']) == (2, 1)
+    data, runs = load_history(cache)
+    assert len(data['run']) == 5 and len(runs) == 2
+
+    # A run emptied (its partition loses every row) and the empty one deleted
+    write_csv(run_a, [])
+    os.remove(empty)
+    counts = ingest(cache, roots=[str(root)], workers=1)
+    assert (counts['empty'], counts['unchanged']) == (1, 1)
+    data, runs = load_history(cache)
+    assert data['power'].tolist() == [22.5, 22.5]
+    assert [entry['path'] for entry in runs.values()] == [os.path.relpath(run_b, REPO_ROOT).replace(os.sep, '/')]
+
+    os.remove(run_b)
+    os.remove(run_a)
+    counts = ingest(cache, roots=[str(root)], workers=1)
+    assert counts['removed'] == 1
+    data, runs = load_history(cache)
+    assert len(data['run']) == 0 and runs == {}
+    assert np.array_equal(data['power'], np.zeros(0))
@@ -0,0 +1,60 @@
+import numpy as np
+
+from .plateaus import segment_plateaus
+
+NOISE = 0.05
+
+
+def sweep():
+    """
+    Three pitch settings with a 12-row settling ramp each (longer than SETTLE) and a step
+    in the power halfway through the last one. Row 70 is a misaligned frame.
+    Returns (data, [(first, stop)] of the rows every plateau should average).
+    """
+    levels = [2.0, 5.0, 3.0]
+    lengths = [30, 31, 50]
+    power, pitch = [], []
+    previous = 0.0
+    for k, (level, length) in enumerate(zip(levels, lengths)):
+        ramp = previous + (level - previous) * np.arange(1, 13) / 12
+        power += list(ramp) + [level] * (length - 12)
+        pitch += [1100.0 + 50 * k] * length
+        previous = level
+    power = np.array(power)
+    power[61 + 25:] += 1.0                                  # the step in the last setting
+    power += np.where(np.arange(len(power)) % 2 == 0, NOISE, -NOISE)
+    data = {'run': np.zeros(len(power), dtype=np.int64), 'pitch': np.array(pitch),
+            'load_setting': np.full(len(power), 10.0), 'power': power, 'rpm': power * 100}
+    data['pitch'][70] = data['power'][70] = data['rpm'][70] = 4.6e31
+    # Each ramp reaches its level at its 12th row; the step up from 2 to 5 is still moving
+    # there (the window before it is on the ramp), and the step in power keeps SETTLE rows
+    expected = [(11, 30), (42, 61), (72, 86), (94, 111)]
+    return data, expected
+
+
+def test_plateaus_of_a_step_sweep():
+    data, expected = sweep()
+    result = segment_plateaus(data)
+    assert result['start'].tolist() == [0, 30, 61, 86]
+    assert result['stop'].tolist() == [30, 61, 86, 111]
+    assert result['pitch'].tolist() == [1100.0, 1150.0, 1200.0, 1200.0]
+    assert result['samples'].tolist() == [stop - first for first, stop in expected]
+    for k, (first, stop) in enumerate(expected):
+        rows = np.arange(first, stop)
+        rows = rows[rows != 70]
+        for s in ('power', 'rpm'):
+            assert np.isclose(result[f'{s}_mean'][k], data[s][rows].mean())
+            assert np.isclose(result[f'{s}_std'][k], data[s][rows].std())
+    # Only the flat rows are averaged: the means are the levels up to the noise
+    assert np.allclose(result['power_mean'], [2.0, 5.0, 3.0, 4.0], atol=NOISE)
+    assert np.all(result['power_std'] <= NOISE + 1e-12)
+
+
+def test_garbage_keys_do_not_start_settings():
+    data, _ = sweep()
+    for row in (5, 45, 100):
+        data['pitch'][row] = data['power'][row] = 1e40
+        data['load_setting'][row] = 7e-31
+    result = segment_plateaus(data)
+    assert result['start'].tolist() == [0, 30, 61, 86]
+    assert np.all(np.abs(result['power_mean']) < 10)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from .schemas import SCHEMAS, detect_schema, get_schema
+from .test_frames import frames_bytes
+
+
+def sample_rows(schema, n=40):
+    # Mid-range values inside every limit of the schema
+    middle = [(low + high) / 2 if high < 1e6 else 10.0 for low, high in schema.limits]
+    return [tuple(value + 0.25 * k for value in middle) for k in range(n)]
+
+
+def test_detects_each_layout_from_its_stream():
+    for name in ('fa24', 'sp25', 'cwc'):
+        schema = get_schema(name)
+        # Start mid-frame, as a port that was already talking would
+        sample = frames_bytes(schema, sample_rows(schema))[7:]
+        detected, margins = detect_schema(sample)
+        assert detected.name == name and margins is None
+
+
+def test_detects_step04_from_its_margins_line():
+    schema = get_schema('step04')
+    sample = b"RPM_MARGINS:1500,900\n" + frames_bytes(schema, sample_rows(schema))
+    detected, margins = detect_schema(sample)
+    assert detected.name == 'step04' and margins == (1500, 900)
+
+
+def test_rows_match_headers():
+    for schema in SCHEMAS.values():
+        frames = schema.decoder().feed_array(frames_bytes(schema, sample_rows(schema, 3)))
+        rows = schema.rows(frames, 10.0)
+        assert rows.shape == (3, len(schema.header.split(',')))
+        assert np.all(rows[:, 0] == 10.0)
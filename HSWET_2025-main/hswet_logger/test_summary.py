@@ -0,0 +1,54 @@
+import numpy as np
+
+from .summary import MISSING_KEY, group_bounds, run_maxima, setting_stats
+
+GARBAGE = 3.4e31
+
+
+def history():
+    """Two runs of three rows each; row 2 is a misaligned frame and row 5 has no power."""
+    nan = np.nan
+    return {
+        'run':          np.array([0, 0, 0, 1, 1, 1], dtype=np.int32),
+        'windspeed':    np.array([10.0, 10.0, 10.0, 9.0, 9.0, 9.0]),
+        'pitch':        np.array([1100.0, 1100.0, GARBAGE, nan, nan, nan]),
+        'load_setting': np.array([0.0, 1.0, 1.0, 2.0, 2.0, 2.0]),
+        'power':        np.array([40.0, 60.0, GARBAGE, 5.0, 7.0, nan]),
+        'rpm':          np.array([4000.0, 5000.0, 2.0, 3000.0, 3200.0, 3400.0]),
+    }
+
+
+def test_group_bounds():
+    a = np.array([2.0, 1.0, 2.0, 1.0, np.nan])
+    b = np.array([5.0, 5.0, 5.0, 6.0, 6.0])
+    order, starts, counts = group_bounds([a, b])
+    groups = [sorted(order[s:s + c].tolist()) for s, c in zip(starts, counts)]
+    # NaN sorts as MISSING_KEY, before every real value
+    assert groups == [[4], [1], [3], [0, 2]]
+    assert np.all(np.diff(np.append(starts, len(order))) == counts)
+
+
+def test_group_bounds_empty():
+    order, starts, counts = group_bounds([np.zeros(0), np.zeros(0)])
+    assert len(order) == len(starts) == len(counts) == 0
+
+
+def test_run_maxima_leaves_out_garbage_rows():
+    runs, counts, mean, at_max = run_maxima(history())
+    assert runs.tolist() == [0, 1]
+    assert counts.tolist() == [2, 2]
+    assert mean.tolist() == [50.0, 6.0]
+    assert at_max.tolist() == [1, 4]
+
+
+def test_setting_stats_leaves_out_garbage_rows():
+    table = setting_stats(history())
+    assert table['windspeed'].tolist() == [9.0, 10.0, 10.0]
+    assert table['pitch'].tolist() == [MISSING_KEY, 1100.0, 1100.0]
+    assert table['load_setting'].tolist() == [2.0, 0.0, 1.0]
+    assert table['samples'].tolist() == [2, 1, 1]
+    assert table['power_mean'].tolist() == [6.0, 40.0, 60.0]
+    assert table['power_std'].tolist() == [1.0, 0.0, 0.0]
+    assert table['power_max'].tolist() == [7.0, 40.0, 60.0]
+    assert table['rpm_mean'].tolist() == [3100.0, 4000.0, 5000.0]
+    assert max(np.max(np.abs(values)) for values in table.values()) < 1e6
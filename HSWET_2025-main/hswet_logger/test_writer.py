@@ -0,0 +1,49 @@
+import numpy as np
+
+from .writer import ChunkedWriter, read_binary
+
+HEADER = 'Windspeed (m/s), Pitch, Power (W)'
+
+
+def csv_rows(path):
+    with open(path) as f:
+        return f.read().splitlines()[1:]
+
+
+def test_chunks_go_to_disk_when_full(tmp_path):
+    path = str(tmp_path / "run.csv")
+    writer = ChunkedWriter(path, HEADER, chunk_rows=4, binary_path=str(tmp_path / "run.bin"))
+    writer.write(np.ones((3, 3)))
+    assert writer.rows_written == 0 and csv_rows(path) == []
+    writer.write(np.full((2, 3), 2.0))
+    assert writer.rows_written == 5
+    assert csv_rows(path) == ['1.00,1.00,1.00'] * 3 + ['2.00,2.00,2.00'] * 2
+    writer.write([3.0, 3.0, 3.0])
+    assert writer.rows_written == 5
+    writer.close()
+    assert writer.rows_written == 6
+    assert csv_rows(path)[-1] == '3.00,3.00,3.00'
+    assert read_binary(str(tmp_path / "run.bin")).shape == (6, 3)
+    writer.close()  # twice is fine
+    assert writer.rows_written == 6
+
+
+def test_context_manager_flushes_on_error(tmp_path):
+    path = str(tmp_path / "run.csv")
+    try:
+        with ChunkedWriter(path, HEADER, chunk_rows=100) as writer:
+            writer.write(np.zeros((2, 3)))
+            raise RuntimeError("port gone")
+    except RuntimeError:
+        pass
+    assert len(csv_rows(path)) == 2
+
+
+def test_rejects_wrong_column_count(tmp_path):
+    with ChunkedWriter(str(tmp_path / "run.csv"), HEADER) as writer:
+        try:
+            writer.write(np.zeros((1, 4)))
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")
@@ -0,0 +1,117 @@
+"""
+Host-side time axis for sketches whose frames carry no timestamp.
+
+SensorData in step02_CWC_ctrl_box.ino has no time field, and the frames reach Python after
+USB and OS buffering, so raw receive times jitter and sometimes arrive in bunches. The
+sketch does send one frame every dataLoggingInterval (250 ms), though. FrameClock uses
+that:
+  - every read is stamped with time.perf_counter_ns(); frames that came in the same read
+    were sent one interval apart, the last one most recently,
+  - each frame gets a sample index from how far its read is past the earliest-arriving
+    reads (delays only ever add time), so skipped indices are frames lost on the way,
+  - a least-squares line time = a + b * index over the last window reads gives the
+    fitted time of each frame.
+So the fitted times keep the real sample rate b (the Arduino clock is not exactly the
+PC's), and gaps show up as missing indices instead of shifting the rest of the run.
+
+A frame can be late by an interval or more without the next one queueing behind it, which
+looks exactly like lost frames. A gap is therefore only accepted when the next read
+confirms it; until then the frame counts as late (one frame gets an index that is too low
+when frames really were lost, instead of every later frame getting one that is too high).
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameClock:
+    """
+    Assigns fitted host times (seconds since the first frame) to frames as they are read.
+    nominal_s is the firmware logging interval; the fit takes over from it after warmup reads.
+    """
+
+    def __init__(self, nominal_s=0.25, warmup=20, tolerance=0.1, window=256):
+        self.nominal = nominal_s
+        self.warmup = warmup
+        self.tolerance = tolerance
+        # Recent (index, time) of the newest frame of each read, for the earliest-arrival line and the fit
+        self.window = window
+        self.recent = deque(maxlen=window)
+        self.t0_ns = None
+        self.last_index = -1
+        self.missing = 0
+        self.a = 0.0
+        self.b = nominal_s
+        self.jitter = 0.0
+        self._late = 0
+        self._gap = None    # (first index after the last accepted gap, its size)
+
+    def stamp(self, count, receive_ns=None):
+        """
+        Fitted times (s) and sample indices for count frames that arrived in one read at
+        receive_ns (default: now). Returns (times, indices) arrays.
+        """
+        if receive_ns is None:
+            receive_ns = time.perf_counter_ns()
+        if count == 0:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        if self.t0_ns is None:
+            self.t0_ns = receive_ns
+        t = (receive_ns - self.t0_ns) / 1e9
+
+        # Where the newest frame of this read would be if it had the smallest delay seen so
+        # far, with a quarter interval of slack for jitter and clock drift
+        if self.recent:
+            x_recent, t_recent = np.array(self.recent).T
+            low = float(np.min(t_recent - self.b * x_recent))
+        else:
+            low = t - self.b * (self.last_index + count)
+        newest = int(np.floor((t - low) / self.b + 0.25))
+        gap = newest - (self.last_index + count)
+        if gap < 0 and self._gap:
+            # Earlier than the last accepted gap allows, so that gap was (partly) frames that
+            # were late, not lost. Their indices are already out; move the frames from before
+            # the gap up instead, so the fit and the earliest-arrival line agree again.
+            start, size = self._gap
+            shift = min(-gap, size)
+            self.recent = deque([(x + shift if x < start else x, tr) for x, tr in self.recent],
+                                maxlen=self.window)
+            self.missing -= shift
+            self._gap = (start, size - shift) if size > shift else None
+        gap = max(gap, 0)
+        late = gap > 0 and not self._late
+        if late:
+            self._late = gap
+            gap = 0
+        elif gap:
+            # Two reads in a row past their slot: frames really were lost before the last one
+            gap = min(gap, self._late)
+            self._late = 0
+        else:
+            self._late = 0
+
+        indices = self.last_index + 1 + gap + np.arange(count)
+        self.missing += gap
+        if gap:
+            self._gap = (int(indices[0]), gap)
+        self.last_index = int(indices[-1])
+        if late:
+            # Its index may be too low, so keep it out of the fit
+            return self.a + self.b * indices, indices
+
+        # Only the newest frame was really received at t (the others waited in the buffer)
+        self.recent.append((float(indices[-1]), t))
+        if len(self.recent) >= self.warmup:
+            x_recent, t_recent = np.array(self.recent).T
+            b, a = np.polyfit(x_recent, t_recent, 1)
+            # Ignore fits that disagree wildly with the firmware (e.g. a long pause)
+            if abs(b - self.nominal) <= self.tolerance * self.nominal:
+                self.a, self.b = float(a), float(b)
+                self.jitter = float(np.std(t_recent - (a + b * x_recent)))
+        return self.a + self.b * indices, indices
+
+    def stats(self):
+        """Measured interval, residual jitter (s, rms over the window) and number of missing frames."""
+        return {'interval_s': self.b, 'rate_hz': 1 / self.b, 'jitter_s': self.jitter,
+                'missing_frames': self.missing, 'frames': self.last_index + 1 - self.missing}
@@ -0,0 +1,157 @@
+"""
+Virtual serial turbine: replays a logged CSV as the byte stream the Arduino would send.
+
+    python -m hswet_logger.virtual_turbine data_logged/05-13-2025_CWC/windspeed_10_00_....csv --speed 10
+    # prints e.g. "PORT : /dev/pts/5", then in another terminal:
+    python -m hswet_logger --port /dev/pts/5 --no-reset --windspeed 10
+
+It opens a pseudo-terminal pair (Linux/Mac) and writes each CSV row as one packed
+SensorData frame (little-endian floats, in the chosen schema's field order), with the
+"Restart tasks"/"Brake tasks" lines the sketch prints, the all -1 end frame and the
+"Residual current:" line after it, as in step02_CWC_ctrl_box.ino. The frame rate is
+configurable up to "as fast as the pty takes it", optionally capped at a UART baud rate,
+and bytes can be dropped at random to exercise the decoder's resync.
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import time
+import tty
+
+import numpy as np
+
+from .csvlog import read_run_csv
+from .schemas import SCHEMAS, get_schema
+
+# The sketches log every dataLoggingInterval = 250 ms
+REAL_RATE = 4.0
+
+# CSV column used for each frame field when the names differ
+FIELD_COLUMNS = {'r_measured': 'resistance'}
+
+
+def frames_from_csv(path, schema):
+    """The rows of a logged CSV as a structured array in the schema's frame layout."""
+    columns = read_run_csv(path)
+    n = len(next(iter(columns.values()))) if columns else 0
+    frames = np.zeros(n, dtype=schema.decoder().dtype)
+    for field in schema.fields:
+        column = FIELD_COLUMNS.get(field, field)
+        if column in columns:
+            frames[field] = columns[column]
+        elif field == 'power' and 'voltage' in columns and 'current' in columns:
+            frames[field] = columns['voltage'] * columns['current']
+        elif field == 'timestamp':
+            frames[field] = np.arange(n) / REAL_RATE
+    return frames
+
+
+def encode_run(frames, schema, text_every=0, margins=None, seed=0):
+    """
+    The byte stream for a run, as a list of items (bytes) that are each sent in one go:
+    the optional RPM_MARGINS line, one item per frame with a brake/restart text line every
+    text_every frames, then the end frame and the residual current line.
+    """
+    rng = random.Random(seed)
+    items = []
+    if margins is not None:
+        items.append(f"RPM_MARGINS:{margins[0]},{margins[1]}\r\n".encode('ascii'))
+    raw = frames.tobytes()  # the schema dtypes are little-endian float32 already
+    size = frames.dtype.itemsize
+    for k in range(len(frames)):
+        item = raw[k * size:(k + 1) * size]
+        if text_every and k % text_every == text_every - 1:
+            item += rng.choice((b"Brake tasks\r\n", b"Restart tasks\r\n"))
+        items.append(item)
+    if schema.end is not None:
+        items.append(struct.pack(schema.struct_format, *([-1.0] * len(schema.fields))))
+        items.append(b"Residual current: 0.00\r\n")
+    return items
+
+
+def drop_bytes(data, rng, drop_prob):
+    """data with each byte independently removed with probability drop_prob."""
+    if drop_prob <= 0:
+        return data
+    return bytes(b for b in data if rng.random() >= drop_prob)
+
+
+class VirtualTurbine:
+    """A pty pair; write to it with replay(), connect the logger to self.port."""
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        # Raw mode so the line discipline does not touch newlines or echo bytes back
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        self.bytes_sent = 0
+        self.bytes_dropped = 0
+
+    def replay(self, items, rate=REAL_RATE, baud=None, drop_prob=0.0, seed=0):
+        """
+        Send items at rate frames per second (0 = as fast as possible), never faster than
+        baud/10 bytes per second if baud is given. Returns the achieved frames per second.
+        """
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        sent_bytes = 0
+        for k, item in enumerate(items):
+            due = start + k / rate if rate else start
+            if baud:
+                due = max(due, start + sent_bytes * 10 / baud)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            data = drop_bytes(item, rng, drop_prob)
+            self.bytes_dropped += len(item) - len(data)
+            os.write(self.master, data)
+            sent_bytes += len(item)
+        self.bytes_sent += sent_bytes
+        elapsed = time.perf_counter() - start
+        return len(items) / elapsed if elapsed > 0 else float('inf')
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m hswet_logger.virtual_turbine',
+                                     description="Replay a logged CSV as a serial turbine on a pty.")
+    parser.add_argument('csv', help="logged run to replay")
+    parser.add_argument('--schema', default='cwc', choices=sorted(SCHEMAS), help="frame layout to send")
+    parser.add_argument('--rate', type=float, default=REAL_RATE, help="frames per second (0 = as fast as possible)")
+    parser.add_argument('--speed', type=float, default=1.0, help="multiplier on --rate, e.g. 10 for 10x real time")
+    parser.add_argument('--baud', type=int, default=None, help="cap the byte rate like a UART at this baud rate")
+    parser.add_argument('--drop-prob', type=float, default=0.0, help="probability of dropping each byte")
+    parser.add_argument('--text-every', type=int, default=0, help="insert a brake/restart line every N frames")
+    parser.add_argument('--margins', default=None, help="send an RPM_MARGINS:high,low line first, e.g. 120,80")
+    parser.add_argument('--delay', type=float, default=3.0, help="seconds to wait for the logger to connect")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    schema = get_schema(args.schema)
+    frames = frames_from_csv(args.csv, schema)
+    margins = tuple(int(v) for v in args.margins.split(',')) if args.margins else None
+    items = encode_run(frames, schema, text_every=args.text_every, margins=margins, seed=args.seed)
+
+    turbine = VirtualTurbine()
+    print(f"PORT : {turbine.port}", flush=True)
+    time.sleep(args.delay)
+    rate = args.rate * args.speed
+    try:
+        achieved = turbine.replay(items, rate=rate, baud=args.baud, drop_prob=args.drop_prob, seed=args.seed)
+        print(f"INFO : sent {len(frames)} frames ({turbine.bytes_sent} bytes, {turbine.bytes_dropped} dropped) "
+              f"at {achieved:.1f} items/s")
+        time.sleep(1.0)  # let the logger drain the pty before it goes away
+    except KeyboardInterrupt:
+        pass
+    finally:
+        turbine.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Append-only writer for logged runs.
+
+The loggers used to keep the whole run in lists and call np.savetxt once at the end, so a
+crash or a dead laptop battery lost the run and memory grew with its length. ChunkedWriter
+keeps at most chunk_rows rows in memory and appends them to disk as they fill up:
+  - a CSV with the same header and number format as before,
+  - optionally a compact binary copy of the same rows in full float32 precision, in the
+    .bin run log format of binlog.py (meta is stored in its header).
+Both files are flushed every chunk and fsync'ed at most every fsync_interval seconds, so a
+failure loses at most one chunk plus whatever the OS had not synced yet.
+"""
+import os
+import time
+
+import numpy as np
+
+from .binlog import as_table, make_header, open_binlog, read_header
+
+
+class ChunkedWriter:
+    """
+    Streams rows (2D arrays, one column per header field) to csv_path, and to binary_path
+    if given. Use it as a context manager, or call close() when the run ends.
+    """
+
+    def __init__(self, csv_path, header, chunk_rows=64, fsync_interval=5.0,
+                 binary_path=None, fmt='%.2f', meta=None):
+        self.csv_path = csv_path
+        self.binary_path = binary_path
+        self.columns = len(header.split(','))
+        self.chunk_rows = chunk_rows
+        self.fsync_interval = fsync_interval
+        self.fmt = fmt
+        self.rows_written = 0
+        self._pending = []
+        self._pending_rows = 0
+        self._last_sync = time.monotonic()
+
+        self._csv = open(csv_path, 'w', newline='')
+        self._csv.write(header + '\n')
+        self._csv.flush()
+        self._bin = None
+        if binary_path:
+            self._bin = open(binary_path, 'wb')
+            self._bin.write(make_header(header, **(meta or {})))
+
+    def write(self, rows):
+        """Queue rows for writing; a full chunk goes to disk straight away."""
+        rows = np.atleast_2d(np.asarray(rows, dtype=float))
+        if rows.shape[1] != self.columns:
+            raise ValueError(f"Expected {self.columns} columns, got {rows.shape[1]}")
+        if len(rows) == 0:
+            return
+        self._pending.append(rows)
+        self._pending_rows += len(rows)
+        if self._pending_rows >= self.chunk_rows:
+            self.flush()
+
+    def flush(self, sync=False):
+        """Write the pending rows, and fsync if sync is set or the interval has passed."""
+        if self._pending:
+            block = np.concatenate(self._pending)
+            self._pending = []
+            self._pending_rows = 0
+            np.savetxt(self._csv, block, delimiter=',', fmt=self.fmt)
+            if self._bin is not None:
+                block.astype('<f4').tofile(self._bin)
+            self.rows_written += len(block)
+        self._csv.flush()
+        if self._bin is not None:
+            self._bin.flush()
+        if sync or time.monotonic() - self._last_sync >= self.fsync_interval:
+            os.fsync(self._csv.fileno())
+            if self._bin is not None:
+                os.fsync(self._bin.fileno())
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        """Write what is left, fsync and close the files. Safe to call twice."""
+        if self._csv.closed:
+            return
+        self.flush(sync=True)
+        self._csv.close()
+        if self._bin is not None:
+            self._bin.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def read_binary(binary_path, columns=None):
+    """
+    Load a binary copy written by ChunkedWriter as a (rows, columns) float32 array. Files
+    from before the .bin header existed are plain rows, so they need columns.
+    """
+    meta, _ = read_header(binary_path)
+    if meta is not None:
+        return as_table(open_binlog(binary_path)[1])
+    data = np.fromfile(binary_path, dtype='<f4')
+    return data[:len(data) - len(data) % columns].reshape(-1, columns)